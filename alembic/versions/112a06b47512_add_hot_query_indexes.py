@@ -0,0 +1,50 @@
+"""add composite indexes for hot booking and request queries
+
+Revision ID: 112a06b47512
+Revises: 87bebbe1c327
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "112a06b47512"
+down_revision: Union[str, None] = "87bebbe1c327"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PENDING_REQUESTS = sa.text("status = 'pending'")
+
+
+def upgrade() -> None:
+    op.create_index("ix_bookings_date_time_experience_type", "bookings", ["date_time", "experience_type"])
+    op.create_index("ix_bookings_user_id_date_time", "bookings", ["user_id", "date_time"])
+    op.create_index(
+        "ix_booking_update_requests_status_created_at",
+        "booking_update_requests",
+        ["status", "created_at", "id"],
+    )
+    op.create_index(
+        "ix_booking_update_requests_user_id_created_at",
+        "booking_update_requests",
+        ["user_id", "created_at"],
+    )
+    op.create_index(
+        "ix_booking_update_requests_pending_created_at",
+        "booking_update_requests",
+        ["created_at", "id"],
+        sqlite_where=PENDING_REQUESTS,
+        postgresql_where=PENDING_REQUESTS,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_update_requests_pending_created_at", table_name="booking_update_requests")
+    op.drop_index("ix_booking_update_requests_user_id_created_at", table_name="booking_update_requests")
+    op.drop_index("ix_booking_update_requests_status_created_at", table_name="booking_update_requests")
+    op.drop_index("ix_bookings_user_id_date_time", table_name="bookings")
+    op.drop_index("ix_bookings_date_time_experience_type", table_name="bookings")
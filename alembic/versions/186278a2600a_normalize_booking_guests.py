@@ -0,0 +1,78 @@
+"""move booking guest contacts into booking_guests
+
+Revision ID: 186278a2600a
+Revises: 112a06b47512
+Create Date: 2026-10-18 12:30:00.000000
+
+"""
+
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "186278a2600a"
+down_revision: Union[str, None] = "112a06b47512"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    booking_guests = op.create_table(
+        "booking_guests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column(
+            "booking_id",
+            sa.Integer(),
+            sa.ForeignKey("bookings.id", ondelete="CASCADE"),
+            nullable=False,
+        ),
+        sa.Column("position", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+    )
+    op.create_index("ix_booking_guests_booking_id", "booking_guests", ["booking_id"])
+    op.create_index("ix_booking_guests_email", "booking_guests", ["email"])
+
+    bind = op.get_bind()
+    rows = []
+    for booking_id, raw in bind.execute(
+        sa.text("SELECT id, guest_contacts FROM bookings WHERE guest_contacts IS NOT NULL AND guest_contacts != ''")
+    ):
+        try:
+            contacts = json.loads(raw)
+        except ValueError:
+            continue
+        for position, contact in enumerate(contacts or []):
+            if isinstance(contact, dict) and contact.get("name") and contact.get("email"):
+                rows.append(
+                    {"booking_id": booking_id, "position": position, "name": contact["name"], "email": contact["email"]}
+                )
+    if rows:
+        op.bulk_insert(booking_guests, rows)
+
+    with op.batch_alter_table("bookings") as batch_op:
+        batch_op.drop_column("guest_contacts")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("bookings") as batch_op:
+        batch_op.add_column(sa.Column("guest_contacts", sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    contacts = {}
+    for booking_id, name, email in bind.execute(
+        sa.text("SELECT booking_id, name, email FROM booking_guests ORDER BY booking_id, position")
+    ):
+        contacts.setdefault(booking_id, []).append({"name": name, "email": email})
+    for booking_id, guests in contacts.items():
+        bind.execute(
+            sa.text("UPDATE bookings SET guest_contacts = :contacts WHERE id = :id"),
+            {"contacts": json.dumps(guests), "id": booking_id},
+        )
+
+    op.drop_index("ix_booking_guests_email", table_name="booking_guests")
+    op.drop_index("ix_booking_guests_booking_id", table_name="booking_guests")
+    op.drop_table("booking_guests")
@@ -0,0 +1,44 @@
+"""add slot occupancy ledger
+
+Revision ID: 63b22260199f
+Revises: 9c3e9a6f29ad
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "63b22260199f"
+down_revision: Union[str, None] = "9c3e9a6f29ad"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "slot_occupancy",
+        sa.Column("date_time", sa.DateTime(), primary_key=True),
+        sa.Column("experience_type", sa.String(), primary_key=True),
+        sa.Column("reserved", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+    )
+
+    op.execute(
+        """
+        INSERT INTO slot_occupancy (date_time, experience_type, reserved, capacity)
+        SELECT date_time,
+               experience_type,
+               SUM(people),
+               CASE experience_type WHEN 'tour_tasting' THEN 12 ELSE 20 END
+        FROM bookings
+        GROUP BY date_time, experience_type
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("slot_occupancy")
@@ -0,0 +1,48 @@
+"""add admin stats counters
+
+Revision ID: 8616bf343794
+Revises: e9345ea58ad1
+Create Date: 2026-10-18 11:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "8616bf343794"
+down_revision: Union[str, None] = "e9345ea58ad1"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "admin_stats",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("admins", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("bookings", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("deleted_users", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("deleted_bookings", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("pending_update_requests", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO admin_stats (id, users, admins, bookings, deleted_users, deleted_bookings, pending_update_requests)
+        SELECT 1,
+               (SELECT COUNT(*) FROM users),
+               (SELECT COUNT(*) FROM users WHERE is_admin = true),
+               (SELECT COUNT(*) FROM bookings),
+               (SELECT COUNT(*) FROM deleted_users),
+               (SELECT COUNT(*) FROM deleted_bookings),
+               (SELECT COUNT(*) FROM booking_update_requests WHERE status = 'pending')
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("admin_stats")
@@ -0,0 +1,83 @@
+"""add daily signup and booking rollups
+
+Revision ID: 87bebbe1c327
+Revises: 8616bf343794
+Create Date: 2026-10-18 11:30:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "87bebbe1c327"
+down_revision: Union[str, None] = "8616bf343794"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("deleted_bookings") as batch_op:
+        batch_op.add_column(sa.Column("experience_type", sa.String(), nullable=True))
+
+    op.create_table(
+        "daily_signups",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("signups", sa.Integer(), nullable=False, server_default="0"),
+    )
+    op.create_table(
+        "daily_bookings",
+        sa.Column("day", sa.Date(), primary_key=True),
+        sa.Column("experience_type", sa.String(), primary_key=True),
+        sa.Column("bookings", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("seats", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("cancellations", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+    op.execute(
+        """
+        INSERT INTO daily_signups (day, signups)
+        SELECT DATE(created_at), COUNT(*)
+        FROM users
+        GROUP BY DATE(created_at)
+        """
+    )
+    op.execute(
+        """
+        INSERT INTO daily_bookings (day, experience_type, bookings, seats, cancellations)
+        SELECT DATE(date_time), experience_type, COUNT(*), SUM(people), 0
+        FROM bookings
+        GROUP BY DATE(date_time), experience_type
+        """
+    )
+    # Earlier deletions did not record the experience type; count them as guided_tour.
+    op.execute(
+        """
+        INSERT INTO daily_bookings (day, experience_type, bookings, seats, cancellations)
+        SELECT DATE(date_time), 'guided_tour', 0, 0, 0
+        FROM deleted_bookings
+        WHERE date_time IS NOT NULL
+        GROUP BY DATE(date_time)
+        EXCEPT
+        SELECT day, experience_type, 0, 0, 0 FROM daily_bookings
+        """
+    )
+    op.execute(
+        """
+        UPDATE daily_bookings
+        SET cancellations = (
+            SELECT COUNT(*) FROM deleted_bookings
+            WHERE DATE(deleted_bookings.date_time) = daily_bookings.day
+        )
+        WHERE experience_type = 'guided_tour'
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("daily_bookings")
+    op.drop_table("daily_signups")
+    with op.batch_alter_table("deleted_bookings") as batch_op:
+        batch_op.drop_column("experience_type")
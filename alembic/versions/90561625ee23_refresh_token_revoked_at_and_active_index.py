@@ -0,0 +1,37 @@
+"""add refresh token revoked_at and active-token index
+
+Revision ID: 90561625ee23
+Revises: 186278a2600a
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "90561625ee23"
+down_revision: Union[str, None] = "186278a2600a"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.add_column(sa.Column("revoked_at", sa.DateTime(), nullable=True))
+
+    op.create_index(
+        "ix_refresh_tokens_active_user_id",
+        "refresh_tokens",
+        ["user_id", "expires_at"],
+        sqlite_where=sa.text("revoked = 0"),
+        postgresql_where=sa.text("revoked = false"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_refresh_tokens_active_user_id", table_name="refresh_tokens")
+    with op.batch_alter_table("refresh_tokens") as batch_op:
+        batch_op.drop_column("revoked_at")
@@ -0,0 +1,51 @@
+"""create booking_update_requests
+
+Revision ID: e9345ea58ad1
+Revises: 93d0a84dc075
+Create Date: 2026-10-18 10:30:00.000000
+
+The table used to be created only by ``create_all`` at startup, so no
+earlier revision has it. Databases that already got it that way keep
+their copy; every later revision can rely on the table being there.
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "e9345ea58ad1"
+down_revision: Union[str, None] = "93d0a84dc075"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    if sa.inspect(op.get_bind()).has_table("booking_update_requests"):
+        return
+    op.create_table(
+        "booking_update_requests",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("booking_id", sa.Integer(), sa.ForeignKey("bookings.id"), nullable=False),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=False),
+        sa.Column("requested_date_time", sa.DateTime(), nullable=True),
+        sa.Column("requested_people", sa.Integer(), nullable=True),
+        sa.Column("requested_info_message", sa.String(), nullable=True),
+        sa.Column("note", sa.String(), nullable=True),
+        sa.Column("status", sa.String(), nullable=False, server_default="pending"),
+        sa.Column("admin_note", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.Column("updated_at", sa.DateTime(), nullable=False, server_default=sa.func.current_timestamp()),
+        sa.Column("processed_at", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_booking_update_requests_id", "booking_update_requests", ["id"])
+    op.create_index("ix_booking_update_requests_booking_id", "booking_update_requests", ["booking_id"])
+    op.create_index("ix_booking_update_requests_user_id", "booking_update_requests", ["user_id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_booking_update_requests_user_id", table_name="booking_update_requests")
+    op.drop_index("ix_booking_update_requests_booking_id", table_name="booking_update_requests")
+    op.drop_index("ix_booking_update_requests_id", table_name="booking_update_requests")
+    op.drop_table("booking_update_requests")
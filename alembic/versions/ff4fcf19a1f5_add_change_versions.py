@@ -0,0 +1,30 @@
+"""add change_versions for conditional GETs
+
+Revision ID: ff4fcf19a1f5
+Revises: 90561625ee23
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+revision: str = "ff4fcf19a1f5"
+down_revision: Union[str, None] = "90561625ee23"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_versions",
+        sa.Column("scope", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False, server_default="0"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("change_versions")
@@ -1,10 +1,12 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models
+from app.auth.jwt_handler import EVENTS_TOKEN_SCOPE
+from app.auth.token_versions import get_token_version
 from app.config import settings
 from app.database import get_db
 
@@ -12,31 +14,61 @@ ALGORITHM = "HS256"
 SECRET_KEY = settings.SECRET_KEY
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
+# Requests that only read may trust a cached token version.
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-class TokenData(BaseModel):
-    email: str | None = None
+class TokenIdentity(BaseModel):
+    id: int
+    email: str
+    is_admin: bool
+    token_version: int
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception():
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+async def _authorize(token: str, db: AsyncSession, scope: str | None = None, fresh: bool = False) -> TokenIdentity:
+    """
+    Authorize from the token claims alone. The only database access is the
+    token-version check, which rejects tokens revoked by a password change,
+    a role change or account deletion. It is served from the per-worker
+    cache unless ``fresh`` is set or the token claims admin rights, so a
+    revoked token can still read on other workers for up to
+    ``TOKEN_VERSION_CACHE_TTL_SECONDS``. Scoped tokens are only accepted
+    where that scope is asked for, and vice versa.
+    """
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
-        raise credentials_exception
-
-    user = db.query(models.User).filter(models.User.email == token_data.email).first()
+        if payload.get("scp") != scope:
+            raise _credentials_exception()
+        identity = TokenIdentity(
+            id=payload["uid"],
+            email=payload["sub"],
+            is_admin=payload["adm"],
+            token_version=payload["ver"],
+        )
+    except (JWTError, KeyError, ValueError):
+        raise _credentials_exception()
+
+    if await get_token_version(db, identity.id, fresh=fresh or identity.is_admin) != identity.token_version:
+        raise _credentials_exception()
+    return identity
+
+async def get_current_identity(
+    request: Request, token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)
+):
+    return await _authorize(token, db, fresh=request.method not in SAFE_METHODS)
+
+async def get_current_user(identity: TokenIdentity = Depends(get_current_identity), db: AsyncSession = Depends(get_db)):
+    user = await db.get(models.User, identity.id)
     if user is None:
-        raise credentials_exception
+        raise _credentials_exception()
     return user
 
-def get_current_admin_user(current_user: models.User = Depends(get_current_user)):
+async def get_current_admin_user(current_user: TokenIdentity = Depends(get_current_identity)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -44,10 +76,14 @@ def get_current_admin_user(current_user: models.User = Depends(get_current_user)
         )
     return current_user
 
-def admin_required(current_user=Depends(get_current_user)):
+async def admin_required(current_user: TokenIdentity = Depends(get_current_identity)):
     if not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Admin privileges required"
         )
     return current_user
+
+async def get_events_admin(token: str = Query(...), db: AsyncSession = Depends(get_db)):
+    """Admin identity from the ``?token=`` issued by ``POST /admin/events/token``."""
+    return await get_current_admin_user(await _authorize(token, db, scope=EVENTS_TOKEN_SCOPE))
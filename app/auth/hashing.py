@@ -1,9 +1,148 @@
+import asyncio
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from fastapi import HTTPException, status
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from app import metrics
+from app.config import settings
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
\ No newline at end of file
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """Verify and, if the stored hash uses an outdated cost factor, return a fresh hash."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class HashMetrics:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.operations: dict[str, dict[str, float]] = {}
+        self.rejected = 0
+        self.rehashed = 0
+
+    def observe(self, operation: str, seconds: float):
+        entry = self.operations.setdefault(
+            operation, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0}
+        )
+        entry["count"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self) -> dict:
+        return {
+            "workers": settings.PASSWORD_HASH_WORKERS,
+            "queue_limit": settings.PASSWORD_HASH_QUEUE_LIMIT,
+            "in_flight": _in_flight,
+            "rejected": self.rejected,
+            "rehashed": self.rehashed,
+            "operations": {
+                name: {
+                    **entry,
+                    "avg_seconds": entry["total_seconds"] / entry["count"] if entry["count"] else 0.0,
+                }
+                for name, entry in self.operations.items()
+            },
+        }
+
+
+hash_metrics = HashMetrics()
+
+metrics.CallbackCounter(
+    "password_hash_rejected_total", "Hash jobs refused with 503 because the queue was full.", (),
+    lambda: {(): hash_metrics.rejected},
+)
+metrics.CallbackCounter(
+    "password_hash_rehashed_total", "Stored hashes upgraded to the current cost factor on login.", (),
+    lambda: {(): hash_metrics.rehashed},
+)
+
+_executor: ProcessPoolExecutor | None = None
+_in_flight = 0
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.PASSWORD_HASH_WORKERS <= 0:
+        return None  # fall back to the loop's default thread pool
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+
+def _warm_up():
+    return None
+
+
+async def warm_hash_pool():
+    """Spawn the hashing workers now so the first logins don't wait for them."""
+    executor = _get_executor()
+    if executor is None:
+        return
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        *(loop.run_in_executor(executor, _warm_up) for _ in range(settings.PASSWORD_HASH_WORKERS))
+    )
+
+
+def shutdown_hash_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run_hash_job(operation: str, fn, *args):
+    """
+    Run a bcrypt call off the event loop in the dedicated worker pool.
+    Requests beyond the queue limit fail fast with 503 instead of piling up
+    behind a login storm and starving every other endpoint.
+    """
+    global _in_flight
+    if _in_flight >= settings.PASSWORD_HASH_QUEUE_LIMIT:
+        hash_metrics.rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is busy, please retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
+    _in_flight += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_get_executor(), fn, *args)
+    finally:
+        _in_flight -= 1
+        elapsed = time.perf_counter() - started
+        hash_metrics.observe(operation, elapsed)
+        metrics.PASSWORD_HASH_SECONDS.observe(elapsed, operation)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run_hash_job("hash", get_password_hash, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run_hash_job("verify", verify_password, plain_password, hashed_password)
+
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    verified, new_hash = await _run_hash_job(
+        "verify", verify_and_update_password, plain_password, hashed_password
+    )
+    if verified and new_hash:
+        hash_metrics.rehashed += 1
+    return verified, new_hash
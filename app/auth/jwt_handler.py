@@ -5,6 +5,8 @@ from app.config import settings
 
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Scope claim of the short-lived tokens that /admin/events takes as ?token=.
+EVENTS_TOKEN_SCOPE = "events"
 
 
 def create_access_token(data: dict, expires_delta: timedelta = None):
@@ -12,3 +14,28 @@ def create_access_token(data: dict, expires_delta: timedelta = None):
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_user_access_token(user, expires_delta: timedelta = None, scope: str | None = None):
+    """Access token carrying everything needed to authorize a request without a user lookup."""
+    data = {
+        "sub": user.email,
+        "uid": user.id,
+        "adm": bool(user.is_admin),
+        "ver": user.token_version or 0,
+    }
+    if scope is not None:
+        data["scp"] = scope
+    return create_access_token(data=data, expires_delta=expires_delta)
+
+
+def create_events_token(user):
+    """
+    Token for the admin event stream. A browser ``EventSource`` cannot send an
+    ``Authorization`` header, so it goes in the URL; it is scoped to the
+    stream and expires after ``EVENTS_TOKEN_TTL_SECONDS``.
+    """
+    return create_user_access_token(
+        user, expires_delta=timedelta(seconds=settings.EVENTS_TOKEN_TTL_SECONDS), scope=EVENTS_TOKEN_SCOPE
+    )
+
@@ -1,29 +1,30 @@
+import asyncio
 import hashlib
 import secrets
 from datetime import datetime, timedelta
 
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, delete, false, func, or_, select, true, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import models
 
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+REVOKED_TOKEN_RETENTION_DAYS = 7
+PURGE_BATCH_SIZE = 1000
+PURGE_PAUSE_SECONDS = 0.05
 
 
 def _hash_token(token: str) -> str:
     return hashlib.sha256(token.encode("utf-8")).hexdigest()
 
 
-def issue_refresh_token(db: Session, user_id: int) -> tuple[str, datetime]:
+async def issue_refresh_token(db: AsyncSession, user_id: int, revoke_existing: bool = True) -> tuple[str, datetime]:
     """
     Generate a new refresh token for the given user, revoking any existing active ones.
     Returns the raw token (to send to the client) and its expiry timestamp.
     """
-    # Revoke existing active tokens for this user
-    db.query(models.RefreshToken).filter(
-        models.RefreshToken.user_id == user_id,
-        models.RefreshToken.revoked.is_(False),
-        models.RefreshToken.expires_at > datetime.utcnow(),
-    ).update({models.RefreshToken.revoked: True}, synchronize_session=False)
+    if revoke_existing:
+        await revoke_refresh_tokens(db, user_id)
 
     raw_token = secrets.token_urlsafe(48)
     expires_at = datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
@@ -35,25 +36,108 @@ def issue_refresh_token(db: Session, user_id: int) -> tuple[str, datetime]:
         expires_at=expires_at,
     )
     db.add(refresh)
-    db.flush()
+    await db.flush()
     return raw_token, expires_at
 
 
-def rotate_refresh_token(db: Session, refresh_obj: models.RefreshToken) -> tuple[str, datetime]:
+async def revoke_refresh_tokens(db: AsyncSession, user_id: int):
+    """Revoke every active refresh token for the user."""
+    now = datetime.utcnow()
+    await db.execute(
+        update(models.RefreshToken)
+        .where(
+            models.RefreshToken.user_id == user_id,
+            models.RefreshToken.revoked == false(),
+            models.RefreshToken.expires_at > now,
+        )
+        .values(revoked=True, revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, refresh_obj: models.RefreshToken) -> tuple[str, datetime] | None:
     """
     Revoke the provided refresh token and issue a new one for the same user.
+    Login already leaves a single active token per user, so only this row is
+    revoked. Returns None if a concurrent request rotated it first.
     """
-    refresh_obj.revoked = True
-    return issue_refresh_token(db, refresh_obj.user_id)
+    result = await db.execute(
+        update(models.RefreshToken)
+        .where(models.RefreshToken.id == refresh_obj.id, models.RefreshToken.revoked == false())
+        .values(revoked=True, revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        return None
+    return await issue_refresh_token(db, refresh_obj.user_id, revoke_existing=False)
 
 
-def get_valid_refresh_token(db: Session, token: str) -> models.RefreshToken | None:
+async def get_valid_refresh_token(db: AsyncSession, token: str) -> models.RefreshToken | None:
     token_hash = _hash_token(token)
-    refresh = db.query(models.RefreshToken).filter(
-        models.RefreshToken.token_hash == token_hash,
-        models.RefreshToken.revoked.is_(False),
-    ).first()
+    refresh = (await db.execute(
+        select(models.RefreshToken).where(
+            models.RefreshToken.token_hash == token_hash,
+            models.RefreshToken.revoked == false(),
+        )
+    )).scalars().first()
 
     if not refresh or refresh.expires_at <= datetime.utcnow():
         return None
     return refresh
+
+
+def _purgeable(now: datetime):
+    revoked_before = now - timedelta(days=REVOKED_TOKEN_RETENTION_DAYS)
+    return or_(
+        models.RefreshToken.expires_at <= now,
+        and_(
+            models.RefreshToken.revoked == true(),
+            # Tokens revoked before revoked_at existed fall back to their creation time.
+            func.coalesce(models.RefreshToken.revoked_at, models.RefreshToken.created_at) <= revoked_before,
+        ),
+    )
+
+
+async def purge_refresh_tokens(
+    session_factory, batch_size: int = PURGE_BATCH_SIZE, pause_seconds: float = PURGE_PAUSE_SECONDS
+) -> int:
+    """
+    Delete expired and long-revoked tokens in short id-bounded transactions,
+    pausing between batches so logins never queue behind one long write lock.
+    Returns the number of rows deleted.
+    """
+    now = datetime.utcnow()
+    deleted = 0
+    while True:
+        async with session_factory() as db:
+            ids = (
+                await db.scalars(
+                    select(models.RefreshToken.id)
+                    .where(_purgeable(now))
+                    .order_by(models.RefreshToken.id)
+                    .limit(batch_size)
+                )
+            ).all()
+            if not ids:
+                return deleted
+            await db.execute(
+                delete(models.RefreshToken)
+                .where(models.RefreshToken.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        deleted += len(ids)
+        await asyncio.sleep(pause_seconds)
+
+
+if __name__ == "__main__":
+    from app.database import AsyncSessionLocal, async_engine
+
+    async def main():
+        try:
+            deleted = await purge_refresh_tokens(AsyncSessionLocal)
+            print(f"Purged {deleted} expired or revoked refresh tokens")
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(main())
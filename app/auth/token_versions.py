@@ -0,0 +1,66 @@
+import time
+from collections import OrderedDict
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+
+_REVOKED_USERS_KEY = "revoked_token_users"
+
+_versions: OrderedDict[int, tuple[float, int | None]] = OrderedDict()
+_generation = 0
+
+
+async def get_token_version(db: AsyncSession, user_id: int, fresh: bool = False) -> int | None:
+    """
+    Current token version for a user, or None if the user no longer exists.
+    Served from a small TTL map so authenticated requests rarely touch the
+    database; ``fresh`` reads the row regardless and refreshes the entry.
+    The map is per worker, so a version bumped elsewhere is only seen by
+    cached reads after ``TOKEN_VERSION_CACHE_TTL_SECONDS``.
+    """
+    now = time.monotonic()
+    cached = None if fresh else _versions.get(user_id)
+    if cached is not None and cached[0] > now:
+        _versions.move_to_end(user_id)
+        return cached[1]
+    generation = _generation
+
+    version = (await db.execute(
+        select(models.User.token_version).where(models.User.id == user_id)
+    )).scalar_one_or_none()
+
+    if generation != _generation:
+        # A revocation landed while we were reading; don't cache a possibly stale value.
+        return version
+    _versions[user_id] = (now + settings.TOKEN_VERSION_CACHE_TTL_SECONDS, version)
+    _versions.move_to_end(user_id)
+    while len(_versions) > settings.TOKEN_VERSION_CACHE_MAX_ENTRIES:
+        _versions.popitem(last=False)
+    return version
+
+
+def revoke_access_tokens(db: AsyncSession, user: models.User):
+    """Invalidate every access token issued to ``user`` once the transaction commits."""
+    user.token_version = (user.token_version or 0) + 1
+    forget_user(db, user.id)
+
+
+def forget_user(db: AsyncSession, user_id: int):
+    """Drop the cached version for ``user_id`` when the current transaction ends."""
+    db.info.setdefault(_REVOKED_USERS_KEY, set()).add(user_id)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _evict_revoked_users(session, transaction):
+    global _generation
+    if transaction.parent is not None:
+        return
+    revoked = session.info.pop(_REVOKED_USERS_KEY, None)
+    if revoked:
+        _generation += 1
+        for user_id in revoked:
+            _versions.pop(user_id, None)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Awaitable, Callable, Hashable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.config import settings
+
+_TOUCHED_SLOTS_KEY = "touched_slots"
+
+
+class _Flight:
+    __slots__ = ("future", "invalidated")
+
+    def __init__(self):
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.invalidated = False
+
+
+class AvailabilityCache:
+    """
+    Bounded TTL/LRU cache for slot occupancy, used from the event loop thread.
+    Concurrent misses for the same key share one loader call (single-flight);
+    a load that overlaps an invalidation is returned to its callers but not stored.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[Hashable, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[Hashable, _Flight] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[object]]):
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return value
+            del self._entries[key]
+
+        self.misses += 1
+        while (flight := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                # Shield so one impatient waiter can't cancel the shared load.
+                return await asyncio.shield(flight.future)
+            except asyncio.CancelledError:
+                if not flight.future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # The leader's own request was cancelled, not ours: load it here.
+
+        flight = self._inflight[key] = _Flight()
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            self._inflight.pop(key, None)
+            flight.future.cancel()
+            raise
+        except Exception as exc:
+            self._inflight.pop(key, None)
+            flight.future.set_exception(exc)
+            flight.future.exception()  # waiters re-raise it; don't log it as unretrieved
+            raise
+
+        self._inflight.pop(key, None)
+        if not flight.invalidated and self.ttl_seconds > 0:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        flight.future.set_result(value)
+        return value
+
+    def invalidate(self, keys):
+        for key in keys:
+            self.invalidations += 1
+            self._entries.pop(key, None)
+            flight = self._inflight.get(key)
+            if flight is not None:
+                flight.invalidated = True
+
+    def clear(self):
+        self._entries.clear()
+        for flight in self._inflight.values():
+            flight.invalidated = True
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+availability_cache = AvailabilityCache(
+    max_entries=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+)
+
+metrics.CallbackCounter(
+    "availability_cache_lookups_total", "Availability cache lookups by result.", ("result",),
+    lambda: {("hit",): availability_cache.hits, ("miss",): availability_cache.misses},
+)
+metrics.CallbackCounter(
+    "availability_cache_evictions_total", "Entries dropped to stay within AVAILABILITY_CACHE_MAX_ENTRIES.", (),
+    lambda: {(): availability_cache.evictions},
+)
+
+
+def track_slot(db, date_time: datetime, experience_type: str):
+    """Remember a slot changed in this transaction so it is evicted once the transaction ends."""
+    db.info.setdefault(_TOUCHED_SLOTS_KEY, set()).add((date_time, experience_type))
+
+
+def touched_slots(session) -> set[tuple[datetime, str]]:
+    return session.info.get(_TOUCHED_SLOTS_KEY, set())
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _invalidate_touched_slots(session, transaction):
+    if transaction.parent is not None:
+        return
+    touched = session.info.pop(_TOUCHED_SLOTS_KEY, None)
+    if touched:
+        availability_cache.invalidate(touched)
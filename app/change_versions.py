@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import logging
+
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import AsyncSessionLocal, upsert_insert
+
+logger = logging.getLogger(__name__)
+
+BOOKINGS_SCOPE = "bookings"
+UPDATE_REQUESTS_SCOPE = "update_requests"
+# Scopes with an ETag reader that spans every user. They are bumped after the
+# writing transaction commits, so writers never queue on one shared row.
+SHARED_SCOPES = frozenset({BOOKINGS_SCOPE})
+AVAILABILITY_CACHE_CONTROL = "public, max-age=5, stale-while-revalidate=30"
+_PENDING_SCOPES_KEY = "pending_shared_scopes"
+
+# Shared scopes committed by this worker and not yet bumped.
+_pending: set[str] = set()
+_background_tasks: set[asyncio.Task] = set()
+
+
+def user_scope(scope: str, user_id: int) -> str:
+    return f"{scope}:user:{user_id}"
+
+
+def _touched_scopes(session: Session) -> set[str]:
+    scopes = set()
+    for obj in (*session.new, *session.deleted, *session.dirty):
+        if isinstance(obj, models.Booking):
+            scope = BOOKINGS_SCOPE
+        elif isinstance(obj, models.BookingUpdateRequest):
+            scope = UPDATE_REQUESTS_SCOPE
+        else:
+            continue
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if scope in SHARED_SCOPES:
+            scopes.add(scope)
+        if obj.user_id is not None:
+            scopes.add(user_scope(scope, obj.user_id))
+    return scopes
+
+
+def _bump(connection, scope: str):
+    table = models.ChangeVersion.__table__
+    make_insert = upsert_insert(connection.dialect.name)
+    if make_insert is not None:
+        statement = make_insert(table).values(scope=scope, version=1)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=["scope"], set_={"version": table.c.version + 1}
+            )
+        )
+        return
+    result = connection.execute(
+        update(table).where(table.c.scope == scope).values(version=table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(scope=scope, version=1))
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_change_versions(session, flush_context):
+    """
+    Advance the per-user scopes this flush wrote to, in the same transaction,
+    and note the shared ones for after the commit.
+    """
+    scopes = _touched_scopes(session)
+    shared = scopes & SHARED_SCOPES
+    if shared:
+        session.info.setdefault(_PENDING_SCOPES_KEY, set()).update(shared)
+    if scopes == shared:
+        return
+    connection = session.connection()
+    for scope in sorted(scopes - shared):
+        _bump(connection, scope)
+
+
+def _take_pending() -> list[str]:
+    scopes = sorted(_pending)
+    _pending.clear()
+    return scopes
+
+
+def _bump_all(connection, scopes: list[str]):
+    for scope in scopes:
+        _bump(connection, scope)
+
+
+async def bump_pending():
+    """Bump the shared scopes this worker has committed to, in a transaction of their own."""
+    # Let bumps already started by this worker land first.
+    running = [task for task in _background_tasks if task.get_loop() is asyncio.get_running_loop()]
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    scopes = _take_pending()
+    if not scopes:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(lambda session: _bump_all(session.connection(), scopes))
+            await db.commit()
+    except BaseException:
+        _pending.update(scopes)
+        raise
+
+
+async def _bump_in_background():
+    try:
+        await bump_pending()
+    except Exception:
+        logger.exception("Could not bump change versions; will retry on the next write")
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    if session.in_nested_transaction():
+        return  # a released SAVEPOINT; wait for the outer commit
+    scopes = session.info.pop(_PENDING_SCOPES_KEY, None)
+    if not scopes:
+        return
+    _pending.update(scopes)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Maintenance scripts use plain sessions and no event loop.
+        with session.get_bind().begin() as connection:
+            _bump_all(connection, _take_pending())
+        return
+    task = loop.create_task(_bump_in_background())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_SCOPES_KEY, None)
+
+
+async def get_version(db: AsyncSession, scope: str) -> int:
+    if scope in SHARED_SCOPES:
+        await bump_pending()  # this worker's own writes are never reported unchanged
+    version = await db.scalar(select(models.ChangeVersion.version).where(models.ChangeVersion.scope == scope))
+    return version or 0
+
+
+def make_etag(request: Request, *parts) -> str:
+    """Weak ETag over the given state and the request's query string."""
+    digest = hashlib.sha1(
+        "|".join([request.url.path, request.url.query, *map(str, parts)]).encode()
+    ).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(request: Request, response: Response, etag: str) -> Response | None:
+    """
+    Attach ``etag`` to the response; if the client already holds it, return
+    a bare 304 for the route to send before loading or serializing any rows.
+    """
+    response.headers["ETag"] = etag
+    candidates = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+    if etag in candidates or "*" in candidates:
+        return Response(status_code=304, headers=dict(response.headers))
+    return None
@@ -1,9 +1,48 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DATABASE_URL: str = "sqlite:///./app.db"
     SECRET_KEY: str = "change-me"  # override in environment for production
+    AVAILABILITY_CACHE_TTL_SECONDS: float = 5.0
+    AVAILABILITY_CACHE_MAX_ENTRIES: int = 4096
+    TOKEN_VERSION_CACHE_TTL_SECONDS: float = 30.0
+    TOKEN_VERSION_CACHE_MAX_ENTRIES: int = 10000
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2  # 0 runs bcrypt on the default thread pool instead
+    PASSWORD_HASH_QUEUE_LIMIT: int = 32
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT_SECONDS: float = 30.0
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE_BYTES: int = 256 * 1024 * 1024
+    SQLITE_CACHE_SIZE_KIB: int = 64 * 1024
+    METRICS_DIR: str = ""  # shared directory for multi-worker metrics; empty keeps them per process
+    METRICS_FLUSH_SECONDS: float = 5.0
+    FAST_SERIALIZATION: bool = False  # admin lists encode rows directly, skipping response_model validation
+    SQL_SLOW_QUERY_MS: float = 200.0  # slower SELECTs are logged with their EXPLAIN plan
+    SQL_REPEATED_STATEMENT_THRESHOLD: int = 5
+    SQL_QUERY_BUDGET: int = 25
+    SQL_QUERY_BUDGET_STRICT: bool = False  # answer over-budget requests with 500 (for tests)
+    SCHEMA_CHECK: Literal["strict", "warn", "off"] = "strict"  # compare the database to the Alembic head on startup
+    DB_POOL_WARM_CONNECTIONS: int = 2
+    STARTUP_BUDGET_SECONDS: float = 10.0  # 0 disables the check
+    STARTUP_BUDGET_STRICT: bool = False  # refuse to start when over budget
+    EVENTS_MAX_SUBSCRIBERS: int = 5000  # live SSE connections per worker
+    EVENTS_SUBSCRIBER_BUFFER: int = 256  # pending entities per client before it is told to resync
+    EVENTS_HEARTBEAT_SECONDS: float = 15.0
+    EVENTS_RETRY_MS: int = 5000
+    EVENTS_TOKEN_TTL_SECONDS: int = 60  # lifetime of the ?token= that opens /admin/events
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = 24 * 60 * 60
+    IDEMPOTENCY_WAIT_SECONDS: float = 10.0  # how long a duplicate waits for the original on another worker
+    IDEMPOTENCY_LOCK_TIMEOUT_SECONDS: float = 60.0  # an unfinished key older than this is treated as abandoned
+    IDEMPOTENCY_PURGE_INTERVAL_SECONDS: float = 300.0
 
 
 settings = Settings()
@@ -0,0 +1,215 @@
+from collections import Counter, defaultdict
+from datetime import date, datetime
+
+from sqlalchemy import case, event, extract, func, inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import upsert_insert
+
+BUCKETS = ("day", "month", "quarter", "year")
+
+def _value_before_flush(obj, attribute: str):
+    history = inspect(obj).attrs[attribute].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attribute)
+
+
+def _flush_deltas(session: Session) -> dict:
+    deltas = defaultdict(Counter)
+
+    def booking(day: date, experience_type: str, **changes):
+        deltas[(models.DailyBookings, (day, experience_type))].update(changes)
+
+    for obj in session.new:
+        if isinstance(obj, models.User):
+            day = (obj.created_at or datetime.utcnow()).date()
+            deltas[(models.DailySignups, (day,))]["signups"] += 1
+        elif isinstance(obj, models.Booking):
+            booking(obj.date_time.date(), obj.experience_type or "guided_tour", bookings=1, seats=obj.people)
+
+    for obj in session.deleted:
+        if isinstance(obj, models.Booking):
+            old_day = _value_before_flush(obj, "date_time").date()
+            old_type = _value_before_flush(obj, "experience_type")
+            booking(old_day, old_type, bookings=-1, seats=-_value_before_flush(obj, "people"), cancellations=1)
+
+    for obj in session.dirty:
+        if not isinstance(obj, models.Booking) or not session.is_modified(obj):
+            continue
+        old = (
+            _value_before_flush(obj, "date_time").date(),
+            _value_before_flush(obj, "experience_type"),
+            _value_before_flush(obj, "people"),
+        )
+        new = (obj.date_time.date(), obj.experience_type, obj.people)
+        if old != new:
+            booking(old[0], old[1], bookings=-1, seats=-old[2])
+            booking(new[0], new[1], bookings=1, seats=new[2])
+
+    return deltas
+
+
+def _upsert(connection, model, key: tuple, changes: dict):
+    table = model.__table__
+    key_values = dict(zip((column.name for column in table.primary_key.columns), key))
+    make_insert = upsert_insert(connection.dialect.name)
+    if make_insert is not None:
+        statement = make_insert(table).values(**key_values, **changes)
+        connection.execute(
+            statement.on_conflict_do_update(
+                index_elements=list(key_values),
+                set_={name: table.c[name] + statement.excluded[name] for name in changes},
+            )
+        )
+        return
+
+    result = connection.execute(
+        update(table)
+        .where(*(table.c[name] == value for name, value in key_values.items()))
+        .values({name: table.c[name] + delta for name, delta in changes.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**key_values, **changes))
+
+
+@event.listens_for(Session, "after_flush")
+def _apply_rollup_deltas(session, flush_context):
+    """Fold this flush's signups and booking changes into the daily rollups."""
+    deltas = _flush_deltas(session)
+    if not deltas:
+        return
+    connection = session.connection()
+    for (model, key), changes in deltas.items():
+        changes = {name: delta for name, delta in changes.items() if delta}
+        if changes:
+            _upsert(connection, model, key, changes)
+
+
+def _as_date(value) -> date:
+    # SQLite returns DATE() results as ISO strings.
+    return date.fromisoformat(value) if isinstance(value, str) else value
+
+
+def rebuild_rollups(db: Session):
+    """Recompute the rollups from the base tables (backfill or drift repair).
+
+    Cancellations logged before deleted_bookings recorded the experience type
+    are attributed to guided_tour.
+    """
+    db.query(models.DailySignups).delete(synchronize_session=False)
+    db.query(models.DailyBookings).delete(synchronize_session=False)
+
+    signups = db.execute(
+        select(func.date(models.User.created_at), func.count()).group_by(func.date(models.User.created_at))
+    ).all()
+    db.add_all(models.DailySignups(day=_as_date(day), signups=count) for day, count in signups)
+
+    rows = {}
+    bookings = db.execute(
+        select(
+            func.date(models.Booking.date_time),
+            models.Booking.experience_type,
+            func.count(),
+            func.sum(models.Booking.people),
+        ).group_by(func.date(models.Booking.date_time), models.Booking.experience_type)
+    ).all()
+    for day, experience_type, count, seats in bookings:
+        rows[(_as_date(day), experience_type)] = models.DailyBookings(
+            day=_as_date(day), experience_type=experience_type, bookings=count, seats=seats or 0, cancellations=0
+        )
+
+    cancelled_type = func.coalesce(models.DeletedBooking.experience_type, "guided_tour")
+    cancellations = db.execute(
+        select(func.date(models.DeletedBooking.date_time), cancelled_type, func.count())
+        .where(models.DeletedBooking.date_time.isnot(None))
+        .group_by(func.date(models.DeletedBooking.date_time), cancelled_type)
+    ).all()
+    for day, experience_type, count in cancellations:
+        key = (_as_date(day), experience_type)
+        row = rows.setdefault(
+            key, models.DailyBookings(day=key[0], experience_type=key[1], bookings=0, seats=0, cancellations=0)
+        )
+        row.cancellations = count
+
+    db.add_all(rows.values())
+    db.commit()
+
+
+def _bucket_columns(column, bucket: str) -> tuple:
+    """Portable GROUP BY expressions: EXTRACT compiles on SQLite and PostgreSQL alike."""
+    if bucket == "day":
+        return (column,)
+    year = extract("year", column)
+    if bucket == "year":
+        return (year,)
+    month = extract("month", column)
+    if bucket == "month":
+        return (year, month)
+    quarter = case((month <= 3, 1), (month <= 6, 2), (month <= 9, 3), else_=4)
+    return (year, quarter)
+
+
+def _period_label(bucket: str, parts) -> str:
+    if bucket == "day":
+        return _as_date(parts[0]).isoformat()
+    year = int(parts[0])
+    if bucket == "year":
+        return str(year)
+    if bucket == "month":
+        return f"{year}-{int(parts[1]):02d}"
+    return f"{year}-Q{int(parts[1])}"
+
+
+async def load_series(
+    db: AsyncSession,
+    bucket: str,
+    start: date,
+    end: date | None = None,
+    experience_type: str | None = None,
+) -> dict[str, dict[str, int]]:
+    """Signups, bookings, seats and cancellations per period for days in [start, end]."""
+    series = defaultdict(lambda: {"signups": 0, "bookings": 0, "seats": 0, "cancellations": 0})
+
+    def in_range(column):
+        return [column >= start] + ([column <= end] if end is not None else [])
+
+    if experience_type is None:
+        groups = _bucket_columns(models.DailySignups.day, bucket)
+        rows = await db.execute(
+            select(*groups, func.sum(models.DailySignups.signups))
+            .where(*in_range(models.DailySignups.day))
+            .group_by(*groups)
+        )
+        for *parts, signups in rows:
+            series[_period_label(bucket, parts)]["signups"] = int(signups or 0)
+
+    groups = _bucket_columns(models.DailyBookings.day, bucket)
+    query = select(
+        *groups,
+        func.sum(models.DailyBookings.bookings),
+        func.sum(models.DailyBookings.seats),
+        func.sum(models.DailyBookings.cancellations),
+    ).where(*in_range(models.DailyBookings.day))
+    if experience_type:
+        query = query.where(models.DailyBookings.experience_type == experience_type)
+    for *parts, bookings, seats, cancellations in await db.execute(query.group_by(*groups)):
+        entry = series[_period_label(bucket, parts)]
+        entry["bookings"] = int(bookings or 0)
+        entry["seats"] = int(seats or 0)
+        entry["cancellations"] = int(cancellations or 0)
+
+    return dict(sorted(series.items()))
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+        print("Daily rollups rebuilt from users, bookings and deleted_bookings")
+    finally:
+        db.close()
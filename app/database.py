@@ -1,18 +1,120 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import AsyncAdaptedQueuePool, QueuePool, create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from . import metrics
 from .config import settings
 
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Swap the blocking DBAPI driver in ``url`` for its asyncio counterpart."""
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+UPSERT_INSERTS = {
+    "sqlite": sqlite.insert,
+    "postgresql": postgresql.insert,
+}
+
+
+def upsert_insert(dialect_name: str):
+    """``insert`` with ``ON CONFLICT`` support for the dialect, or None if it has none."""
+    return UPSERT_INSERTS.get(dialect_name)
+
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_memory(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database in (None, "", ":memory:")
+
+
+class _TimedCheckout:
+    """Pool mixin recording how long callers wait for a connection."""
+
+    engine_label = "sync"
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            metrics.DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - started, self.engine_label)
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def engine_options(url: str) -> dict:
+    """Pool and driver options for ``url``; dialect-specific bits only where they apply."""
+    options = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    if _is_sqlite(url):
+        # Connections are handed between threads by the pool and the aiosqlite worker.
+        options["connect_args"] = {"check_same_thread": False}
+        if _is_sqlite_memory(url):
+            return options  # single shared connection; sizing options don't apply
+    options.update(
+        poolclass=TimedAsyncQueuePool if make_url(url).get_dialect().is_async else TimedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+    )
+    return options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute(f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT_MS)}")
+        cursor.execute(f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}")
+        cursor.execute(f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE_BYTES)}")
+        cursor.execute(f"PRAGMA cache_size = -{int(settings.SQLITE_CACHE_SIZE_KIB)}")
+    finally:
+        cursor.close()
+
+
+def configure_engine(engine):
+    if engine.dialect.name == "sqlite" and not _is_sqlite_memory(str(engine.url)):
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+# Blocking engine for Alembic and command-line maintenance scripts.
+engine = configure_engine(create_engine(SQLALCHEMY_DATABASE_URL, **engine_options(SQLALCHEMY_DATABASE_URL)))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+# Request handlers use the async engine so database waits don't hold a worker thread.
+ASYNC_DATABASE_URL = to_async_url(SQLALCHEMY_DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL))
+configure_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
\ No newline at end of file
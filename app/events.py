@@ -0,0 +1,206 @@
+import asyncio
+from collections import OrderedDict, defaultdict
+from datetime import datetime
+from typing import Callable, Hashable
+
+import pydantic_core
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app import models, schemas, slot_ledger
+from app.availability_cache import touched_slots
+from app.config import settings
+from app.database import AsyncSessionLocal
+
+AVAILABILITY_CHANNEL = "availability"
+ADMIN_CHANNEL = "admin"
+_PENDING_EVENTS_KEY = "pending_events"
+_background_tasks: set[asyncio.Task] = set()
+
+
+class Event:
+    __slots__ = ("key", "name", "fields", "payload")
+
+    def __init__(self, key: Hashable, name: str, data: dict, fields: dict | None = None):
+        self.key = key
+        self.name = name
+        self.fields = fields or {}
+        # Encoded once, however many subscribers receive it.
+        self.payload = f"event: {name}\ndata: {pydantic_core.to_json(data).decode()}\n\n"
+
+
+class Subscription:
+    """
+    Pending events for one client, keyed by the entity they describe, so a
+    burst of changes to the same slot or booking collapses to its latest
+    state. A client that falls ``EVENTS_SUBSCRIBER_BUFFER`` entities behind
+    is sent a single ``resync`` instead of an ever-growing backlog.
+    """
+
+    __slots__ = ("channel", "accepts", "pending", "overflowed", "closed", "wakeup")
+
+    def __init__(self, channel: str, accepts: Callable[[dict], bool] | None):
+        self.channel = channel
+        self.accepts = accepts
+        self.pending: OrderedDict[Hashable, Event] = OrderedDict()
+        self.overflowed = False
+        self.closed = False
+        self.wakeup = asyncio.Event()
+
+    def push(self, item: Event):
+        if self.accepts is not None and not self.accepts(item.fields):
+            return
+        if not self.overflowed:
+            self.pending.pop(item.key, None)
+            self.pending[item.key] = item
+            if len(self.pending) > settings.EVENTS_SUBSCRIBER_BUFFER:
+                self.pending.clear()
+                self.overflowed = True
+        self.wakeup.set()
+
+    async def next_batch(self, timeout: float) -> list[str] | None:
+        """Encoded events ready to send, or None if nothing arrived within ``timeout``."""
+        try:
+            await asyncio.wait_for(self.wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self.wakeup.clear()
+        if self.overflowed:
+            self.overflowed = False
+            return ["event: resync\ndata: {}\n\n"]
+        batch = [item.payload for item in self.pending.values()]
+        self.pending.clear()
+        return batch
+
+
+class EventBus:
+    """In-process fan-out from committed writes to this worker's SSE clients."""
+
+    def __init__(self):
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def has_subscribers(self, channel: str) -> bool:
+        return bool(self._subscribers.get(channel))
+
+    def subscribe(self, channel: str, accepts: Callable[[dict], bool] | None = None) -> Subscription:
+        if self.subscriber_count() >= settings.EVENTS_MAX_SUBSCRIBERS:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many live connections, please retry shortly",
+                headers={"Retry-After": "5"},
+            )
+        subscription = Subscription(channel, accepts)
+        self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers[subscription.channel].discard(subscription)
+
+    def publish(self, channel: str, item: Event):
+        for subscription in self._subscribers.get(channel, ()):
+            subscription.push(item)
+
+    def close(self):
+        for subscribers in self._subscribers.values():
+            for subscription in subscribers:
+                subscription.closed = True
+                subscription.wakeup.set()
+
+
+event_bus = EventBus()
+
+
+async def _stream(subscription: Subscription):
+    try:
+        yield f"retry: {int(settings.EVENTS_RETRY_MS)}\n\n"
+        while not subscription.closed:
+            batch = await subscription.next_batch(settings.EVENTS_HEARTBEAT_SECONDS)
+            # Comment lines keep proxies from closing idle connections.
+            yield "".join(batch) if batch else ": keepalive\n\n"
+    finally:
+        event_bus.unsubscribe(subscription)
+
+
+def event_stream(subscription: Subscription) -> StreamingResponse:
+    return StreamingResponse(
+        _stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _booking_event(booking: models.Booking, action: str) -> Event:
+    data = {
+        "action": action,
+        "id": booking.id,
+        "user_id": booking.user_id,
+        "date_time": booking.date_time,
+        "experience_type": booking.experience_type,
+        "people": booking.people,
+    }
+    return Event(("booking", booking.id), "booking", data)
+
+
+def _update_request_event(update_request: models.BookingUpdateRequest, action: str) -> Event:
+    data = schemas.BookingUpdateRequest.model_validate(update_request).model_dump(mode="json")
+    return Event(("update_request", update_request.id), "update_request", {"action": action, **data})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_admin_events(session, flush_context):
+    if not event_bus.has_subscribers(ADMIN_CHANNEL):
+        return
+    events = []
+    for obj in session.new:
+        if isinstance(obj, models.Booking):
+            events.append(_booking_event(obj, "created"))
+        elif isinstance(obj, models.BookingUpdateRequest):
+            events.append(_update_request_event(obj, "created"))
+    for obj in session.dirty:
+        if isinstance(obj, models.Booking) and session.is_modified(obj):
+            events.append(_booking_event(obj, "updated"))
+        elif isinstance(obj, models.BookingUpdateRequest) and inspect(obj).attrs.status.history.has_changes():
+            events.append(_update_request_event(obj, obj.status))
+    for obj in session.deleted:
+        if isinstance(obj, models.Booking):
+            events.append(_booking_event(obj, "deleted"))
+    if events:
+        session.info.setdefault(_PENDING_EVENTS_KEY, []).extend(events)
+
+
+async def _publish_slots(slots: set[tuple[datetime, str]]):
+    # One ledger read per commit, shared by every subscriber. It bypasses the
+    # availability cache, which may not have dropped these slots yet.
+    async with AsyncSessionLocal() as db:
+        occupancy = await slot_ledger.read_slots(db, slots)
+    for (date_time, experience_type), (capacity, booked) in sorted(occupancy.items()):
+        slot = slot_ledger.slot_status(date_time, experience_type, capacity, booked)
+        event_bus.publish(AVAILABILITY_CHANNEL, Event(("slot", date_time, experience_type), "slot", slot, slot))
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_committed(session):
+    if session.in_nested_transaction():
+        return  # a released SAVEPOINT; wait for the outer commit
+    for item in session.info.pop(_PENDING_EVENTS_KEY, ()):
+        event_bus.publish(ADMIN_CHANNEL, item)
+    slots = touched_slots(session)
+    if slots and event_bus.has_subscribers(AVAILABILITY_CHANNEL):
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # maintenance scripts: no event loop, no subscribers
+        task = loop.create_task(_publish_slots(set(slots)))
+        _background_tasks.add(task)
+        task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_EVENTS_KEY, None)
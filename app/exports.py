@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from datetime import date
+from typing import Sequence, Type
+
+import pydantic_core
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy import Select
+
+from app.database import AsyncSessionLocal
+from app.serialization import attach_guest_contacts, select_rows
+
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "json": "application/json",
+}
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+async def _export_rows(query: Select, order_by: Sequence, schema: Type[BaseModel], fmt: str):
+    # The request's session is closed before the body is sent, so the
+    # stream owns its own session for as long as the client keeps reading.
+    fields = list(schema.model_fields)
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    if fmt == "csv":
+        writer.writeheader()
+    elif fmt == "json":
+        yield "["
+    separator = b""
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(
+            select_rows(query, schema).order_by(*order_by).execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        async for batch in result.mappings().partitions():
+            rows = [dict(row) for row in batch]
+            if "guest_contacts" in fields:
+                await attach_guest_contacts(db, rows)
+            if fmt == "csv":
+                for row in pydantic_core.to_jsonable_python(rows):
+                    writer.writerow({key: _csv_value(value) for key, value in row.items()})
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            elif fmt == "json":
+                yield separator + b",".join(pydantic_core.to_json(row) for row in rows)
+                separator = b","
+            else:
+                yield b"".join(pydantic_core.to_json(row) + b"\n" for row in rows)
+
+    if buffer.tell():
+        yield buffer.getvalue()
+    if fmt == "json":
+        yield "]"
+
+
+def export_response(
+    name: str,
+    query: Select,
+    order_by: Sequence,
+    schema: Type[BaseModel],
+    fmt: str,
+    since=None,
+) -> StreamingResponse:
+    """
+    Stream ``query`` as CSV, NDJSON or a JSON array, one server-side batch at
+    a time. Rows are read as plain column tuples and encoded directly.
+    Rows are ordered by ``order_by`` ascending; when ``since`` is given only
+    rows whose first ordering column is at or after it are exported, so a
+    client can resume from the last value it received.
+    """
+    if since is not None:
+        query = query.where(order_by[0] >= since)
+    filename = f"{name}-{date.today():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        _export_rows(query, order_by, schema, fmt),
+        media_type=EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Type
+
+import pydantic_core
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import models
+from app.config import settings
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+POLL_INTERVAL_SECONDS = 0.1
+
+# (user_id, key) -> the original request's outcome, for duplicates arriving
+# at this worker while it is still running.
+_in_flight: dict[tuple[int, str], "_Flight"] = {}
+_next_purge = 0.0
+
+
+class _Flight:
+    __slots__ = ("fingerprint", "future")
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+def fingerprint(request: Request, payload: BaseModel) -> str:
+    body = pydantic_core.to_json(payload.model_dump(mode="json"))
+    return hashlib.sha256(f"{request.method} {request.url.path}\n".encode() + body).hexdigest()
+
+
+def _replay(status_code: int, body: bytes) -> Response:
+    return Response(body, status_code=status_code, media_type="application/json", headers={REPLAYED_HEADER: "true"})
+
+
+def _reused_key():
+    return HTTPException(
+        status_code=422, detail=f"{IDEMPOTENCY_HEADER} was already used with a different request"
+    )
+
+
+def _key_filter(user_id: int, key: str):
+    return models.IdempotencyKey.user_id == user_id, models.IdempotencyKey.key == key
+
+
+async def _purge_due(db, now: datetime):
+    global _next_purge
+    if time.monotonic() < _next_purge:
+        return
+    _next_purge = time.monotonic() + settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS
+    await db.execute(
+        delete(models.IdempotencyKey)
+        .where(models.IdempotencyKey.expires_at <= now)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def _claim(db: AsyncSession, user_id: int, key: str, request_fingerprint: str):
+    """
+    Commit the key as in progress and return its row, or return the stored
+    ``(status_code, body)`` of a completed request. A request still running
+    on another worker is waited for up to ``IDEMPOTENCY_WAIT_SECONDS``.
+    """
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        now = datetime.utcnow()
+        await _purge_due(db, now)
+        claim = models.IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            fingerprint=request_fingerprint,
+            created_at=now,
+            expires_at=now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+        )
+        db.add(claim)
+        try:
+            await db.commit()
+            return claim
+        except IntegrityError:
+            await db.rollback()
+
+        stored = (
+            await db.execute(
+                select(
+                    models.IdempotencyKey.fingerprint,
+                    models.IdempotencyKey.status_code,
+                    models.IdempotencyKey.response_body,
+                    models.IdempotencyKey.created_at,
+                    models.IdempotencyKey.expires_at,
+                ).where(*_key_filter(user_id, key))
+            )
+        ).first()
+        if stored is None:
+            continue  # released or purged in between
+        abandoned = stored.status_code is None and stored.created_at <= now - timedelta(
+            seconds=settings.IDEMPOTENCY_LOCK_TIMEOUT_SECONDS
+        )
+        if stored.expires_at <= now or abandoned:
+            await db.execute(delete(models.IdempotencyKey).where(*_key_filter(user_id, key)))
+            await db.commit()
+            continue
+        if stored.fingerprint != request_fingerprint:
+            raise _reused_key()
+        if stored.status_code is not None:
+            return stored.status_code, stored.response_body
+
+        await db.rollback()
+        if time.monotonic() >= deadline:
+            raise HTTPException(
+                status_code=409,
+                detail=f"A request with this {IDEMPOTENCY_HEADER} is still being processed",
+                headers={"Retry-After": "1"},
+            )
+        await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+async def _release(db: AsyncSession, user_id: int, key: str):
+    await db.rollback()
+    await db.execute(
+        delete(models.IdempotencyKey).where(
+            *_key_filter(user_id, key), models.IdempotencyKey.status_code.is_(None)
+        )
+    )
+    await db.commit()
+
+
+async def idempotent(
+    request: Request,
+    db: AsyncSession,
+    user_id: int,
+    payload: BaseModel,
+    schema: Type[BaseModel],
+    handler: Callable[[], Awaitable],
+):
+    """
+    Run ``handler`` at most once per ``Idempotency-Key`` and user. Repeats
+    get the stored response (status and body) with ``Idempotent-Replayed``
+    set; a repeat that arrives while the original is running waits for it.
+    Errors below 500 are stored too, so a retried 409 stays a 409; server
+    errors release the key so the client can try again. The key is claimed
+    and settled in ``db``, in transactions of its own around the handler's.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return await handler()
+    if not key or len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(status_code=400, detail=f"{IDEMPOTENCY_HEADER} must be 1-{MAX_KEY_LENGTH} characters")
+
+    scope = (user_id, key)
+    request_fingerprint = fingerprint(request, payload)
+    while (flight := _in_flight.get(scope)) is not None:
+        if flight.fingerprint != request_fingerprint:
+            raise _reused_key()
+        outcome = await asyncio.shield(flight.future)
+        if outcome is not None:
+            return _replay(*outcome)
+        # The original failed without a stored response; run this one instead.
+
+    flight = _in_flight[scope] = _Flight(request_fingerprint)
+    claim = None
+    outcome = None
+    try:
+        claim = await _claim(db, user_id, key, request_fingerprint)
+        if isinstance(claim, tuple):
+            outcome, claim = claim, None
+            return _replay(*outcome)
+        error = None
+        try:
+            result = await handler()
+        except HTTPException as exc:
+            if exc.status_code >= 500:
+                raise
+            await db.rollback()
+            error = exc
+            outcome = exc.status_code, pydantic_core.to_json({"detail": exc.detail})
+        else:
+            outcome = 200, schema.model_validate(result).model_dump_json().encode()
+        claim.status_code, claim.response_body = outcome
+        await db.commit()
+        if error is not None:
+            raise error
+        return Response(outcome[1], media_type="application/json")
+    finally:
+        try:
+            if claim is not None and outcome is None:
+                await asyncio.shield(_release(db, user_id, key))
+        finally:
+            del _in_flight[scope]
+            flight.future.set_result(outcome)
+
+
+async def purge_idempotency_keys(session_factory) -> int:
+    """Delete expired keys; the API also does this every ``IDEMPOTENCY_PURGE_INTERVAL_SECONDS``."""
+    async with session_factory() as db:
+        result = await db.execute(
+            delete(models.IdempotencyKey)
+            .where(models.IdempotencyKey.expires_at <= datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        )
+        await db.commit()
+    return result.rowcount
+
+
+if __name__ == "__main__":
+    from app.database import AsyncSessionLocal, async_engine
+
+    async def main():
+        try:
+            deleted = await purge_idempotency_keys(AsyncSessionLocal)
+            print(f"Purged {deleted} expired idempotency keys")
+        finally:
+            await async_engine.dispose()
+
+    asyncio.run(main())
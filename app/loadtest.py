@@ -0,0 +1,294 @@
+"""
+Load harness for the booking API.
+
+    python -m app.loadtest                         # every scenario, in-process
+    python -m app.loadtest availability_polling booking_rush --requests 2000
+    python -m app.loadtest --url http://127.0.0.1:8000 --admin-email a@x.io --admin-password ...
+    python -m app.loadtest --save-baseline         # record the current numbers
+    python -m app.loadtest --compare               # exit 1 on a regression
+
+In-process runs drive the ASGI app through httpx and write to whatever
+``DATABASE_URL`` points at, so point it at a scratch database created with
+``python -m app.startup init-db``.
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from pathlib import Path
+
+import httpx
+
+from app.schemas import BOOKING_SLOTS
+
+BASELINE_PATH = Path(__file__).resolve().parent.parent / "loadtest_baselines.json"
+DEFAULT_REQUESTS = 500
+DEFAULT_CONCURRENCY = 20
+DEFAULT_USERS = 20
+DEFAULT_TOLERANCE = 0.2
+USER_PASSWORD = "loadtest-password"
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    seconds: float
+    latencies: list[float] = field(repr=False)
+
+    def percentile(self, fraction: float) -> float:
+        ordered = sorted(self.latencies)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def summary(self) -> dict:
+        return {
+            "requests": self.requests,
+            "throughput_rps": round(self.requests / self.seconds, 1) if self.seconds else 0.0,
+            "p50_ms": round(self.percentile(0.50) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "error_rate": round(self.errors / self.requests, 4) if self.requests else 0.0,
+        }
+
+
+@dataclass
+class Context:
+    client: httpx.AsyncClient
+    rng: random.Random
+    users: list[dict]
+    admin_headers: dict | None
+    rush_slot: str
+
+
+def _slot(rng: random.Random, days_ahead: tuple[int, int] = (7, 60)) -> str:
+    day = date.today() + timedelta(days=rng.randint(*days_ahead))
+    hour, minute = rng.choice(BOOKING_SLOTS)
+    return f"{day}T{hour:02d}:{minute:02d}:00"
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> dict:
+    response = await client.post("/token", data={"username": email, "password": password})
+    response.raise_for_status()
+    return response.json()
+
+
+# Each scenario step issues one request and returns (response, accepted statuses).
+
+async def login_storm(ctx: Context, user: dict):
+    response = await ctx.client.post("/token", data={"username": user["email"], "password": USER_PASSWORD})
+    if response.status_code == 200:
+        user["tokens"] = response.json()
+    return response, {200}
+
+
+async def availability_polling(ctx: Context, user: dict):
+    response = await ctx.client.get("/bookings/availability", params={"date_time": _slot(ctx.rng)})
+    return response, {200}
+
+
+async def booking_rush(ctx: Context, user: dict):
+    # Everyone wants the same slot: once it is full, 409 is the correct answer.
+    response = await ctx.client.post(
+        "/bookings/",
+        json={"date_time": ctx.rush_slot, "people": 1, "experience_type": "guided_tour"},
+        headers={"Authorization": f"Bearer {user['tokens']['access_token']}"},
+    )
+    return response, {200, 409}
+
+
+async def refresh_rotation(ctx: Context, user: dict):
+    response = await ctx.client.post(
+        "/token/refresh", json={"refresh_token": user["tokens"]["refresh_token"]}
+    )
+    if response.status_code == 200:
+        user["tokens"] = response.json()
+    return response, {200}
+
+
+ADMIN_PAGES = ("/admin/stats", "/admin/overview", "/admin/bookings", "/admin/trends", "/admin/booking-update-requests")
+
+
+async def admin_dashboard(ctx: Context, user: dict):
+    response = await ctx.client.get(ctx.rng.choice(ADMIN_PAGES), headers=ctx.admin_headers)
+    return response, {200}
+
+
+SCENARIOS = {
+    "login_storm": login_storm,
+    "availability_polling": availability_polling,
+    "booking_rush": booking_rush,
+    "refresh_rotation": refresh_rotation,
+    "admin_dashboard": admin_dashboard,
+}
+
+
+async def run_scenario(ctx: Context, step, total: int, concurrency: int) -> Result:
+    latencies: list[float] = []
+    errors = 0
+    remaining = total
+
+    async def virtual_user(index: int):
+        nonlocal remaining, errors
+        user = ctx.users[index % len(ctx.users)]
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                response, accepted = await step(ctx, user)
+                failed = response.status_code not in accepted
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(virtual_user(index) for index in range(concurrency)))
+    return Result(requests=len(latencies), errors=errors, seconds=time.perf_counter() - started, latencies=latencies)
+
+
+async def _seed_users(client: httpx.AsyncClient, count: int, run_id: str) -> list[dict]:
+    users = []
+    for index in range(count):
+        email = f"loadtest-{run_id}-{index}@example.com"
+        response = await client.post(
+            "/users/",
+            json={"name": "Load", "surname": f"Test{index}", "email": email, "phone": "000", "password": USER_PASSWORD},
+        )
+        response.raise_for_status()
+        users.append({"email": email, "tokens": await _login(client, email, USER_PASSWORD)})
+    return users
+
+
+def _promote_in_process(email: str):
+    from app import models
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        db.query(models.User).filter(models.User.email == email).one().is_admin = True
+        db.commit()
+    finally:
+        db.close()
+
+
+async def run(args) -> dict[str, dict]:
+    rng = random.Random(args.seed)
+    run_id = f"{int(time.time())}-{rng.randrange(10**6)}"
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        lifespan = None
+    else:
+        from app.main import app
+
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=args.timeout
+        )
+        lifespan = app.router.lifespan_context(app)
+        await lifespan.__aenter__()
+
+    try:
+        users = await _seed_users(client, args.users, run_id)
+        admin_headers = None
+        if args.admin_email:
+            tokens = await _login(client, args.admin_email, args.admin_password)
+            admin_headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+        elif not args.url:
+            _promote_in_process(users[0]["email"])
+            tokens = await _login(client, users[0]["email"], USER_PASSWORD)
+            admin_headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        ctx = Context(client, rng, users, admin_headers, rush_slot=_slot(rng, (60, 300)))
+        results = {}
+        for name in args.scenarios:
+            if name == "admin_dashboard" and admin_headers is None:
+                print(f"skipping {name}: pass --admin-email/--admin-password when using --url", file=sys.stderr)
+                continue
+            result = await run_scenario(ctx, SCENARIOS[name], args.requests, args.concurrency)
+            results[name] = result.summary()
+        return results
+    finally:
+        await client.aclose()
+        if lifespan is not None:
+            await lifespan.__aexit__(None, None, None)
+
+
+def compare(results: dict[str, dict], baselines: dict[str, dict], tolerance: float) -> list[str]:
+    """Regressions beyond ``tolerance`` (a fraction) against the stored numbers."""
+    regressions = []
+    for name, current in results.items():
+        baseline = baselines.get(name)
+        if baseline is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if current[key] > baseline[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {current[key]} > {baseline[key]} baseline")
+        if current["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {current['throughput_rps']} < {baseline['throughput_rps']} baseline"
+            )
+        if current["error_rate"] > baseline["error_rate"] + 0.01:
+            regressions.append(f"{name}: error rate {current['error_rate']} > {baseline['error_rate']} baseline")
+    return regressions
+
+
+def _print_table(results: dict[str, dict]):
+    columns = ("requests", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "error_rate")
+    print(f"{'scenario':<22}" + "".join(f"{column:>16}" for column in columns))
+    for name, summary in results.items():
+        print(f"{name:<22}" + "".join(f"{summary[column]:>16}" for column in columns))
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.loadtest", description="Load-test the booking API.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--url", help="run against a server instead of the in-process app")
+    parser.add_argument("--requests", type=int, default=DEFAULT_REQUESTS, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="accounts created (at least --concurrency)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--admin-email")
+    parser.add_argument("--admin-password")
+    parser.add_argument("--baseline-file", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+    args.scenarios = args.scenarios or list(SCENARIOS)
+    # Each virtual user owns one account, so token rotation never races itself.
+    args.users = max(args.users, args.concurrency)
+
+    results = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_table(results)
+
+    if args.save_baseline:
+        baselines = json.loads(args.baseline_file.read_text()) if args.baseline_file.exists() else {}
+        baselines.update(results)
+        args.baseline_file.write_text(json.dumps(baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baseline saved to {args.baseline_file}")
+    if args.compare:
+        if not args.baseline_file.exists():
+            print(f"no baseline at {args.baseline_file}", file=sys.stderr)
+            return 1
+        regressions = compare(results, json.loads(args.baseline_file.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
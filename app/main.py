@@ -1,104 +1,184 @@
-from fastapi import FastAPI, Depends, HTTPException
-from sqlalchemy.orm import Session
-from . import models, schemas
-from .database import engine, SessionLocal
+import asyncio
+import time
+
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Query, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import change_versions, models, schemas, slot_ledger
+from .slot_ledger import MUSEUM_TZ, booking_slot_time, ensure_within_operating_hours, normalize_slot, to_local_naive
+from .availability_cache import availability_cache
+from .pagination import NEXT_CURSOR_HEADER, PageParams, paginate
+from .database import async_engine, get_db
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from collections import defaultdict
+from contextlib import asynccontextmanager
 from typing import List
-from datetime import datetime
-from zoneinfo import ZoneInfo
-import json
+from datetime import date, datetime, timedelta
+from app.config import settings
 from app.routes import auth_routes
 from app.routes import admin_routes 
 from app.routes import user_routes
-from app.auth.dependencies import get_current_user
-
-
-models.Base.metadata.create_all(bind=engine)
-
-app = FastAPI()
-app.include_router(auth_routes.router)
-app.include_router(admin_routes.router)
-app.include_router(user_routes.router)
-# CORS (optional)
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"], 
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Dependency
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-OPERATING_START_HOUR = 9
-OPERATING_START_MINUTE = 0
-OPERATING_END_HOUR = 19
-OPERATING_END_MINUTE = 30
-MUSEUM_TZ = ZoneInfo("Europe/Rome")
-
-
-def normalize_slot(dt: datetime) -> datetime:
-    return dt.replace(second=0, microsecond=0)
-
-
-def to_local_naive(dt: datetime) -> datetime:
-    if dt.tzinfo is None:
-        return dt
-    return dt.astimezone(MUSEUM_TZ).replace(tzinfo=None)
-
-
-def ensure_within_operating_hours(dt: datetime):
-    dt_time = dt.time()
-    if dt_time.hour < OPERATING_START_HOUR or (
-        dt_time.hour == OPERATING_START_HOUR and dt_time.minute < OPERATING_START_MINUTE
-    ):
-        raise HTTPException(status_code=400, detail="Bookings start at 09:00")
-    if dt_time.hour > OPERATING_END_HOUR or (
-        dt_time.hour == OPERATING_END_HOUR and dt_time.minute > OPERATING_END_MINUTE
-    ):
-        raise HTTPException(status_code=400, detail="Last booking slot finishes at 19:30")
-def log_deleted_booking(db, booking):
+from app.auth.dependencies import TokenIdentity, get_current_identity
+from app.auth.hashing import shutdown_hash_pool, warm_hash_pool
+from app.metrics import MetricsMiddleware, metrics_response, registry
+from app.query_stats import QueryStatsMiddleware, query_budget
+from app.startup import StartupState, verify_schema, warm_database
+from app.events import AVAILABILITY_CHANNEL, event_bus, event_stream
+from app.idempotency import idempotent
+
+router = APIRouter()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    state: StartupState = app.state.startup
+    with state.phase("schema_check"):
+        await verify_schema(async_engine)
+    with state.phase("warm_pools"):
+        await asyncio.gather(warm_database(async_engine, settings.DB_POOL_WARM_CONNECTIONS), warm_hash_pool())
+    with state.phase("warm_schemas"):
+        app.openapi()
+    state.mark_ready()
+    yield
+    state.ready = False
+    event_bus.close()
+    registry.flush()
+    shutdown_hash_pool()
+    await async_engine.dispose()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    return metrics_response()
+
+
+@router.get("/health/live", include_in_schema=False)
+async def get_liveness():
+    return {"status": "ok"}
+
+
+@router.get("/health/ready", include_in_schema=False)
+async def get_readiness(request: Request):
+    state: StartupState = request.app.state.startup
+    return JSONResponse(state.snapshot(), status_code=200 if state.ready else 503)
+
+CALENDAR_MAX_DAYS = 93
+NEXT_AVAILABLE_WINDOW_DAYS = 14
+NEXT_AVAILABLE_HORIZON_DAYS = 365
+
+
+async def log_deleted_booking(db: AsyncSession, booking):
+    user = await db.get(models.User, booking.user_id)
     deleted = models.DeletedBooking(
         booking_id=booking.id,
         date_time=booking.date_time,
         people=booking.people,
+        experience_type=booking.experience_type,
         info_message=booking.info_message,
-        user_id=booking.user.id,
-        user_name=booking.user.name,
-        user_surname=booking.user.surname,
-        user_email=booking.user.email,
-        user_phone=booking.user.phone
+        user_id=user.id,
+        user_name=user.name,
+        user_surname=user.surname,
+        user_email=user.email,
+        user_phone=user.phone
     )
     db.add(deleted)
-    db.commit()
 
 
-@app.post("/bookings/", response_model=schemas.Booking)
-def create_booking(
+@router.post("/bookings/", response_model=schemas.Booking)
+async def create_booking(
+    request: Request,
     booking: schemas.BookingCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
-    local_dt = to_local_naive(booking.date_time)
-    booking_datetime = normalize_slot(local_dt)
-    ensure_within_operating_hours(booking_datetime)
+    """Send an ``Idempotency-Key`` header to make retries safe: a repeat returns the first response."""
+    return await idempotent(
+        request, db, current_user.id, booking, schemas.Booking, lambda: _create_booking(db, booking, current_user)
+    )
+
+
+async def _create_booking(db: AsyncSession, booking: schemas.BookingCreate, current_user: TokenIdentity):
+    booking_datetime = booking_slot_time(booking.date_time)
     booking_data = booking.dict()
     booking_data["date_time"] = booking_datetime
-    guest_contacts = booking_data.pop("guest_contacts", None)
-    if guest_contacts:
-        booking_data["guest_contacts"] = json.dumps([contact for contact in guest_contacts])
     db_booking = models.Booking(**booking_data, user_id=current_user.id)
+    await slot_ledger.reserve_seats(db, booking_datetime, db_booking.experience_type, db_booking.people)
     db.add(db_booking)
-    db.commit()
-    db.refresh(db_booking)
+    await db.commit()
+    await db.refresh(db_booking)
     return db_booking
 
+def _batch_failures(errors: dict[int, HTTPException]) -> list[dict]:
+    return [{"index": index, "msg": errors[index].detail} for index in sorted(errors)]
+
+
+@router.post("/bookings/batch", response_model=schemas.BookingBatchResult)
+async def create_bookings_batch(
+    batch: schemas.BookingBatchCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
+):
+    """
+    Create many bookings in one transaction. Capacity for every affected slot
+    is read in one query, and seats are claimed with one conditional UPDATE
+    per distinct slot rather than one per booking.
+    """
+    atomic = batch.mode == "atomic"
+    errors: dict[int, HTTPException] = {}
+    slots: dict[int, tuple[datetime, str]] = {}
+    for index, item in enumerate(batch.bookings):
+        try:
+            slot_time = booking_slot_time(item.date_time)
+        except HTTPException as exc:
+            errors[index] = exc
+            continue
+        slots[index] = (slot_time, item.experience_type)
+
+    occupancy = await slot_ledger.read_slots(db, slots.values()) if slots else {}
+    remaining = {slot: capacity - reserved for slot, (capacity, reserved) in occupancy.items()}
+    accepted = defaultdict(list)
+    for index, slot in slots.items():
+        people = batch.bookings[index].people
+        if people > remaining[slot]:
+            errors[index] = HTTPException(status_code=409, detail="Not enough seats available for this slot")
+            continue
+        remaining[slot] -= people
+        accepted[slot].append(index)
+
+    if atomic and errors:
+        status_code = 400 if any(exc.status_code == 400 for exc in errors.values()) else 409
+        raise HTTPException(status_code=status_code, detail=_batch_failures(errors))
+
+    demands = {slot: sum(batch.bookings[i].people for i in indexes) for slot, indexes in accepted.items()}
+    lost = await slot_ledger.reserve_many(db, demands) if demands else set()
+    if lost:
+        # Concurrent bookings took the seats after the capacity read.
+        conflict = HTTPException(status_code=409, detail="Not enough seats available for this slot")
+        lost_errors = {index: conflict for slot in lost for index in accepted.pop(slot)}
+        if atomic:
+            raise HTTPException(status_code=409, detail=_batch_failures(lost_errors))
+        errors.update(lost_errors)
+
+    created: dict[int, models.Booking] = {}
+    for slot, indexes in accepted.items():
+        for index in indexes:
+            booking_data = batch.bookings[index].dict()
+            booking_data["date_time"] = slot[0]
+            created[index] = models.Booking(**booking_data, user_id=current_user.id)
+    db.add_all(created.values())
+    await db.commit()
+
+    results = []
+    for index in range(len(batch.bookings)):
+        if index in created:
+            results.append(schemas.BookingBatchItemResult(index=index, status="created", booking=created[index]))
+        else:
+            results.append(schemas.BookingBatchItemResult(index=index, status="failed", error=errors[index].detail))
+    return schemas.BookingBatchResult(created=len(created), failed=len(errors), results=results)
+
 def parse_iso_datetime(value: str) -> datetime:
     try:
         if value.endswith("Z"):
@@ -109,13 +189,15 @@ def parse_iso_datetime(value: str) -> datetime:
 
 
 # Availability endpoint placed before dynamic /bookings/{booking_id} route
-@app.get("/bookings/availability")
-def get_booking_availability(
+@router.get("/bookings/availability", dependencies=[Depends(query_budget(2))])
+async def get_booking_availability(
+    request: Request,
+    response: Response,
     date_time: str,
     experience_type: str = "guided_tour",
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
 ):
-    if experience_type not in {"guided_tour", "tour_tasting"}:
+    if experience_type not in slot_ledger.EXPERIENCE_CAPACITY:
         raise HTTPException(status_code=400, detail="Invalid experience type")
 
     parsed_date = parse_iso_datetime(date_time)
@@ -123,33 +205,132 @@ def get_booking_availability(
     normalized = normalize_slot(local_dt)
     ensure_within_operating_hours(normalized)
 
-    capacity = 20 if experience_type == "guided_tour" else 12
-    booked = (
-        db.query(models.Booking)
-        .filter(
-            models.Booking.date_time == normalized,
-            models.Booking.experience_type == experience_type,
+    capacity, booked = await availability_cache.get_or_load(
+        (normalized, experience_type),
+        lambda: slot_ledger.read_occupancy(db, normalized, experience_type),
+    )
+    response.headers["Cache-Control"] = change_versions.AVAILABILITY_CACHE_CONTROL
+    etag = change_versions.make_etag(request, normalized, experience_type, capacity, booked)
+    if (cached := change_versions.not_modified(request, response, etag)) is not None:
+        return cached
+    return slot_ledger.slot_status(normalized, experience_type, capacity, booked)
+
+
+def resolve_experience_types(experience_type: str | None) -> list[str]:
+    if experience_type is None:
+        return list(slot_ledger.EXPERIENCE_CAPACITY)
+    if experience_type not in slot_ledger.EXPERIENCE_CAPACITY:
+        raise HTTPException(status_code=400, detail="Invalid experience type")
+    return [experience_type]
+
+
+@router.get("/bookings/availability/calendar")
+async def get_availability_calendar(
+    response: Response,
+    date_from: date = Query(..., alias="from"),
+    date_to: date = Query(..., alias="to"),
+    experience_type: str | None = None,
+    db: AsyncSession = Depends(get_db),
+):
+    response.headers["Cache-Control"] = change_versions.AVAILABILITY_CACHE_CONTROL
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days >= CALENDAR_MAX_DAYS:
+        raise HTTPException(
+            status_code=400, detail=f"Calendar range is limited to {CALENDAR_MAX_DAYS} days"
         )
-        .count()
+
+    experience_types = resolve_experience_types(experience_type)
+    occupancy = await slot_ledger.get_slots_between(
+        db,
+        datetime.combine(date_from, datetime.min.time()),
+        datetime.combine(date_to + timedelta(days=1), datetime.min.time()),
+        experience_types,
     )
 
-    return {
-        "date_time": normalized,
-        "experience_type": experience_type,
-        "capacity": capacity,
-        "booked": booked,
-        "remaining": max(capacity - booked, 0),
-        "is_full": booked >= capacity,
-    }
+    slots = []
+    for slot_time in slot_ledger.iter_slot_times(date_from, date_to):
+        for kind in experience_types:
+            capacity, booked = occupancy.get((slot_time, kind)) or slot_ledger.empty_occupancy(kind)
+            slots.append(slot_ledger.slot_status(slot_time, kind, capacity, booked))
+
+    return {"from": date_from, "to": date_to, "slots": slots}
 
 
-@app.get("/bookings/{booking_id}", response_model=schemas.Booking)
-def read_booking(
+@router.get("/bookings/availability/stream")
+async def stream_availability(
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+    experience_type: str | None = None,
+):
+    """
+    Server-Sent Events: a ``slot`` event with the slot's new occupancy after
+    every committed booking change, optionally limited to one experience
+    and a date range. A ``resync`` event means the client fell behind and
+    should refetch.
+    """
+    experience_types = set(resolve_experience_types(experience_type))
+
+    def accepts(slot: dict) -> bool:
+        day = slot["date_time"].date()
+        return (
+            slot["experience_type"] in experience_types
+            and (date_from is None or day >= date_from)
+            and (date_to is None or day <= date_to)
+        )
+
+    return event_stream(event_bus.subscribe(AVAILABILITY_CHANNEL, accepts))
+
+
+@router.get("/bookings/availability/next-available")
+async def get_next_available_slots(
+    response: Response,
+    people: int = Query(1, gt=0),
+    experience_type: str = "guided_tour",
+    after: str | None = None,
+    limit: int = Query(5, gt=0, le=50),
+    db: AsyncSession = Depends(get_db),
+):
+    response.headers["Cache-Control"] = change_versions.AVAILABILITY_CACHE_CONTROL
+    experience_types = resolve_experience_types(experience_type)
+    if after:
+        start = normalize_slot(to_local_naive(parse_iso_datetime(after)))
+    else:
+        start = datetime.now(MUSEUM_TZ).replace(tzinfo=None)
+
+    horizon = start.date() + timedelta(days=NEXT_AVAILABLE_HORIZON_DAYS)
+    window_start = start.date()
+    found = []
+    while window_start <= horizon and len(found) < limit:
+        window_end = min(window_start + timedelta(days=NEXT_AVAILABLE_WINDOW_DAYS - 1), horizon)
+        occupancy = await slot_ledger.get_slots_between(
+            db,
+            datetime.combine(window_start, datetime.min.time()),
+            datetime.combine(window_end + timedelta(days=1), datetime.min.time()),
+            experience_types,
+        )
+        for slot_time in slot_ledger.iter_slot_times(window_start, window_end):
+            if slot_time <= start:
+                continue
+            capacity, booked = (
+                occupancy.get((slot_time, experience_type)) or slot_ledger.empty_occupancy(experience_type)
+            )
+            if capacity - booked >= people:
+                found.append(slot_ledger.slot_status(slot_time, experience_type, capacity, booked))
+                if len(found) == limit:
+                    break
+        window_start = window_end + timedelta(days=1)
+
+    return found
+
+
+@router.get("/bookings/{booking_id}", response_model=schemas.Booking)
+async def read_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await db.get(models.Booking, booking_id)
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -159,63 +340,87 @@ def read_booking(
     return booking
 
 
-@app.put("/bookings/{booking_id}", response_model=schemas.Booking)
-def update_booking(
+@router.put("/bookings/{booking_id}", response_model=schemas.Booking)
+async def update_booking(
     booking_id: int,
     booking: schemas.BookingUpdate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
-    db_booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    db_booking = await db.get(models.Booking, booking_id)
     if db_booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
     if not current_user.is_admin and db_booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to update this booking")
 
+    old_slot = (db_booking.date_time, db_booking.experience_type, db_booking.people)
     for field, value in booking.dict(exclude_unset=True).items():
         if field == "date_time" and value is not None:
-            value = normalize_slot(to_local_naive(value))
-            ensure_within_operating_hours(value)
-        if field == "guest_contacts":
-            value = json.dumps(value) if value else None
+            value = booking_slot_time(value)
         setattr(db_booking, field, value)
 
-    db.commit()
-    db.refresh(db_booking)
+    await slot_ledger.move_seats(
+        db, *old_slot, db_booking.date_time, db_booking.experience_type, db_booking.people
+    )
+    await db.commit()
+    await db.refresh(db_booking)
     return db_booking
 
-@app.delete("/bookings/{booking_id}")
-def delete_booking(
+@router.delete("/bookings/{booking_id}")
+async def delete_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
-    db_booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    db_booking = await db.get(models.Booking, booking_id)
     if db_booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
     if not current_user.is_admin and db_booking.user_id != current_user.id:
         raise HTTPException(status_code=403, detail="Not authorized to delete this booking")
 
-    log_deleted_booking(db, db_booking)
-    db.delete(db_booking)
-    db.commit()
+    await log_deleted_booking(db, db_booking)
+    await slot_ledger.release_seats(db, db_booking.date_time, db_booking.experience_type, db_booking.people)
+    await db.delete(db_booking)
+    await db.commit()
     return {"message": "Booking deleted successfully"}
 
-@app.get("/deleted-bookings/", response_model=List[schemas.DeletedBooking])
-def get_deleted_bookings(db: Session = Depends(get_db)):
-    return db.query(models.DeletedBooking).all()
+@router.get("/deleted-bookings/", response_model=List[schemas.DeletedBooking])
+async def get_deleted_bookings(
+    query=Depends(admin_routes.deleted_bookings_query),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+):
+    return await paginate(db, query, (models.DeletedBooking.id,), page)
+
+
+@router.post("/bookings/{booking_id}/update-request", response_model=schemas.BookingUpdateRequest)
+async def request_booking_update(
+    request: Request,
+    booking_id: int,
+    request_payload: schemas.BookingUpdateRequestCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
+):
+    """Accepts an ``Idempotency-Key`` header, like ``POST /bookings/``."""
+    return await idempotent(
+        request,
+        db,
+        current_user.id,
+        request_payload,
+        schemas.BookingUpdateRequest,
+        lambda: _request_booking_update(db, booking_id, request_payload, current_user),
+    )
 
 
-@app.post("/bookings/{booking_id}/update-request", response_model=schemas.BookingUpdateRequest)
-def request_booking_update(
+async def _request_booking_update(
+    db: AsyncSession,
     booking_id: int,
     request_payload: schemas.BookingUpdateRequestCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+    current_user: TokenIdentity,
 ):
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await db.get(models.Booking, booking_id)
     if booking is None:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -223,21 +428,25 @@ def request_booking_update(
         raise HTTPException(status_code=403, detail="Not authorized to update this booking")
 
     pending_request = (
-        db.query(models.BookingUpdateRequest)
-        .filter(
-            models.BookingUpdateRequest.booking_id == booking_id,
-            models.BookingUpdateRequest.status == "pending",
+        await db.scalars(
+            select(models.BookingUpdateRequest).where(
+                models.BookingUpdateRequest.booking_id == booking_id,
+                models.BookingUpdateRequest.status == "pending",
+            )
         )
-        .first()
-    )
+    ).first()
 
     if pending_request and not current_user.is_admin:
         raise HTTPException(status_code=400, detail="A pending update request already exists")
 
+    requested_date_time = request_payload.requested_date_time
+    if requested_date_time is not None:
+        requested_date_time = booking_slot_time(requested_date_time)
+
     new_request = models.BookingUpdateRequest(
         booking_id=booking_id,
         user_id=current_user.id,
-        requested_date_time=request_payload.requested_date_time,
+        requested_date_time=requested_date_time,
         requested_people=request_payload.requested_people,
         requested_info_message=request_payload.requested_info_message,
         note=request_payload.note,
@@ -246,27 +455,60 @@ def request_booking_update(
     )
 
     if current_user.is_admin and new_request.status == "approved":
+        old_slot = (booking.date_time, booking.experience_type, booking.people)
         if new_request.requested_date_time:
             booking.date_time = new_request.requested_date_time
         if new_request.requested_people:
             booking.people = new_request.requested_people
         if new_request.requested_info_message is not None:
             booking.info_message = new_request.requested_info_message
+        await slot_ledger.move_seats(db, *old_slot, booking.date_time, booking.experience_type, booking.people)
 
     db.add(new_request)
-    db.commit()
-    db.refresh(new_request)
+    await db.commit()
+    await db.refresh(new_request)
     return new_request
 
 
-@app.get("/bookings/update-requests/me", response_model=List[schemas.BookingUpdateRequest])
-def list_my_booking_update_requests(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+@router.get("/bookings/update-requests/me", response_model=List[schemas.BookingUpdateRequest])
+async def list_my_booking_update_requests(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
+    scope = change_versions.user_scope(change_versions.UPDATE_REQUESTS_SCOPE, current_user.id)
+    etag = change_versions.make_etag(request, scope, await change_versions.get_version(db, scope))
+    if (cached := change_versions.not_modified(request, response, etag)) is not None:
+        return cached
     return (
-        db.query(models.BookingUpdateRequest)
-        .filter(models.BookingUpdateRequest.user_id == current_user.id)
-        .order_by(models.BookingUpdateRequest.created_at.desc())
-        .all()
+        await db.scalars(
+            select(models.BookingUpdateRequest)
+            .where(models.BookingUpdateRequest.user_id == current_user.id)
+            .order_by(models.BookingUpdateRequest.created_at.desc())
+        )
+    ).all()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(lifespan=lifespan)
+    app.state.startup = StartupState(started=IMPORT_STARTED)
+    app.include_router(auth_routes.router)
+    app.include_router(admin_routes.router)
+    app.include_router(user_routes.router)
+    app.include_router(router)
+    # CORS (optional)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["*"], 
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER, "Link"],
     )
+    app.add_middleware(QueryStatsMiddleware)
+    app.add_middleware(MetricsMiddleware)
+    return app
+
+
+app = create_app()
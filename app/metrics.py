@@ -0,0 +1,217 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Sequence
+
+from fastapi import Response
+
+from app.config import settings
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: dict[tuple, list[float]] = {}
+        registry.register(self)
+
+    def samples(self) -> dict[tuple, list[float]]:
+        return self._values
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        # Only ever touched from the event loop thread, so no lock is needed.
+        values = self._values.get(labels)
+        if values is None:
+            self._values[labels] = [amount]
+        else:
+            values[0] += amount
+
+
+class CallbackCounter(_Metric):
+    """Counter read from existing in-process stats at collection time."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, label_names, read: Callable[[], dict[tuple, float]]):
+        super().__init__(name, documentation, label_names)
+        self._read = read
+
+    def samples(self) -> dict[tuple, list[float]]:
+        return {labels: [float(value)] for labels, value in self._read().items()}
+
+
+class Histogram(_Metric):
+    """Per-bucket (non-cumulative) counts followed by the running sum."""
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, label_names=(), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value: float, *labels: str):
+        values = self._values.get(labels)
+        if values is None:
+            values = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+class Registry:
+    """
+    Collects this worker's metrics and, when ``METRICS_DIR`` is set, merges
+    them with the snapshots other uvicorn workers flush to that directory.
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+        self._snapshot_name = f"{os.getpid()}-{time.time_ns()}.json"
+        self._last_flush = 0.0
+
+    def register(self, metric: _Metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        return {
+            name: [[list(labels), values] for labels, values in metric.samples().items()]
+            for name, metric in self._metrics.items()
+        }
+
+    def flush(self):
+        if not settings.METRICS_DIR:
+            return
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        temporary = directory / f".{self._snapshot_name}.tmp"
+        temporary.write_text(json.dumps(self.snapshot()))
+        os.replace(temporary, directory / self._snapshot_name)
+        self._last_flush = time.monotonic()
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR and time.monotonic() - self._last_flush >= settings.METRICS_FLUSH_SECONDS:
+            self.flush()
+
+    def _merged(self) -> dict[str, dict[tuple, list[float]]]:
+        merged: dict[str, dict[tuple, list[float]]] = {}
+        snapshots = [self.snapshot()]
+        if settings.METRICS_DIR:
+            # Files of exited workers are kept so counters never go backwards.
+            for path in Path(settings.METRICS_DIR).glob("*.json"):
+                if path.name != self._snapshot_name:
+                    try:
+                        snapshots.append(json.loads(path.read_text()))
+                    except (OSError, ValueError):
+                        continue
+        for snapshot in snapshots:
+            for name, samples in snapshot.items():
+                metric = self._metrics.get(name)
+                if metric is None:
+                    continue
+                series = merged.setdefault(name, {})
+                for labels, values in samples:
+                    labels = tuple(labels)
+                    if labels not in series:
+                        series[labels] = list(values)
+                    elif len(series[labels]) == len(values):
+                        series[labels] = [a + b for a, b in zip(series[labels], values)]
+        return merged
+
+    def render(self) -> str:
+        lines = []
+        for name, series in self._merged().items():
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            for labels, values in sorted(series.items()):
+                if metric.kind != "histogram":
+                    lines.append(f"{name}{_labels(metric.label_names, labels)} {_number(values[0])}")
+                    continue
+                cumulative = 0.0
+                for bound, count in zip((*metric.buckets, "+Inf"), values[:-1]):
+                    cumulative += count
+                    le = 'le="+Inf"' if bound == "+Inf" else f'le="{bound}"'
+                    lines.append(f"{name}_bucket{_labels(metric.label_names, labels, le)} {_number(cumulative)}")
+                lines.append(f"{name}_sum{_labels(metric.label_names, labels)} {_number(values[-1])}")
+                lines.append(f"{name}_count{_labels(metric.label_names, labels)} {_number(cumulative)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status code.", ("method", "route", "status")
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Time to send the full response, by route template.", ("method", "route")
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds", "Wait for a connection from the database pool.", ("engine",)
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds", "bcrypt job time including the pool queue.", ("operation",)
+)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware so streamed bodies are timed to their last chunk."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Label by route template, never the raw path, to keep cardinality bounded.
+            route = getattr(scope.get("route"), "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            HTTP_REQUEST_SECONDS.observe(time.perf_counter() - started, method, route)
+            registry.maybe_flush()
+
+
+def metrics_response() -> Response:
+    registry.flush()
+    return Response(registry.render(), media_type=CONTENT_TYPE)
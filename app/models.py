@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Boolean, Index, LargeBinary, false, text
 from sqlalchemy.orm import relationship
 from .database import Base
 from datetime import datetime, timezone
@@ -15,6 +15,7 @@ class User(Base):
     password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    token_version = Column(Integer, default=0, nullable=False)
 
     bookings = relationship("Booking", back_populates="user")
     booking_update_requests = relationship(
@@ -24,6 +25,10 @@ class User(Base):
 
 class Booking(Base):
     __tablename__ = "bookings"
+    __table_args__ = (
+        Index("ix_bookings_date_time_experience_type", "date_time", "experience_type"),
+        Index("ix_bookings_user_id_date_time", "user_id", "date_time"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     date_time = Column(DateTime, nullable=False)
@@ -32,12 +37,42 @@ class Booking(Base):
     user_id = Column(Integer, ForeignKey("users.id"))
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     experience_type = Column(String, nullable=False, default="guided_tour")
-    guest_contacts = Column(String)
 
     user = relationship("User", back_populates="bookings")
     update_requests = relationship(
         "BookingUpdateRequest", back_populates="booking", cascade="all, delete-orphan"
     )
+    # Always bulk-loaded: one extra IN query per result set, never per row.
+    guests = relationship(
+        "BookingGuest",
+        back_populates="booking",
+        cascade="all, delete-orphan",
+        order_by="BookingGuest.position",
+        lazy="selectin",
+    )
+
+    @property
+    def guest_contacts(self):
+        return [{"name": guest.name, "email": guest.email} for guest in self.guests] or None
+
+    @guest_contacts.setter
+    def guest_contacts(self, contacts):
+        self.guests = [
+            BookingGuest(position=position, name=contact["name"], email=contact["email"])
+            for position, contact in enumerate(contacts or [])
+        ]
+
+
+class BookingGuest(Base):
+    __tablename__ = "booking_guests"
+
+    id = Column(Integer, primary_key=True)
+    booking_id = Column(Integer, ForeignKey("bookings.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False, default=0)
+    name = Column(String, nullable=False)
+    email = Column(String, nullable=False, index=True)
+
+    booking = relationship("Booking", back_populates="guests")
  
     
 class DeletedBooking(Base):
@@ -47,6 +82,7 @@ class DeletedBooking(Base):
     booking_id = Column(Integer, index=True, nullable=False)
     date_time = Column(DateTime)
     people = Column(Integer)
+    experience_type = Column(String)
     info_message = Column(String)
     user_id = Column(Integer, index=True, nullable=False)
     user_name = Column(String, nullable=False)
@@ -78,12 +114,38 @@ class RefreshToken(Base):
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     revoked = Column(Boolean, default=False, nullable=False)
+    revoked_at = Column(DateTime)
 
     user = relationship("User")
 
 
+# Only live tokens are indexed, so issuance and validation stay cheap however
+# many revoked or expired rows are waiting for the purge job.
+Index(
+    "ix_refresh_tokens_active_user_id",
+    RefreshToken.user_id,
+    RefreshToken.expires_at,
+    sqlite_where=RefreshToken.revoked == false(),
+    postgresql_where=RefreshToken.revoked == false(),
+)
+
+
+PENDING_REQUESTS = text("status = 'pending'")
+
+
 class BookingUpdateRequest(Base):
     __tablename__ = "booking_update_requests"
+    __table_args__ = (
+        Index("ix_booking_update_requests_status_created_at", "status", "created_at", "id"),
+        Index("ix_booking_update_requests_user_id_created_at", "user_id", "created_at"),
+        Index(
+            "ix_booking_update_requests_pending_created_at",
+            "created_at",
+            "id",
+            sqlite_where=PENDING_REQUESTS,
+            postgresql_where=PENDING_REQUESTS,
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     booking_id = Column(Integer, ForeignKey("bookings.id"), nullable=False, index=True)
@@ -100,3 +162,61 @@ class BookingUpdateRequest(Base):
 
     booking = relationship("Booking", back_populates="update_requests")
     user = relationship("User", back_populates="booking_update_requests")
+
+
+class SlotOccupancy(Base):
+    __tablename__ = "slot_occupancy"
+
+    date_time = Column(DateTime, primary_key=True)
+    experience_type = Column(String, primary_key=True)
+    reserved = Column(Integer, default=0, nullable=False)
+    capacity = Column(Integer, nullable=False)
+
+
+class AdminStats(Base):
+    __tablename__ = "admin_stats"
+
+    id = Column(Integer, primary_key=True)
+    users = Column(Integer, default=0, nullable=False)
+    admins = Column(Integer, default=0, nullable=False)
+    bookings = Column(Integer, default=0, nullable=False)
+    deleted_users = Column(Integer, default=0, nullable=False)
+    deleted_bookings = Column(Integer, default=0, nullable=False)
+    pending_update_requests = Column(Integer, default=0, nullable=False)
+
+
+class DailySignups(Base):
+    __tablename__ = "daily_signups"
+
+    day = Column(Date, primary_key=True)
+    signups = Column(Integer, default=0, nullable=False)
+
+
+class DailyBookings(Base):
+    __tablename__ = "daily_bookings"
+
+    day = Column(Date, primary_key=True)
+    experience_type = Column(String, primary_key=True)
+    bookings = Column(Integer, default=0, nullable=False)
+    seats = Column(Integer, default=0, nullable=False)
+    cancellations = Column(Integer, default=0, nullable=False)
+
+
+class ChangeVersion(Base):
+    __tablename__ = "change_versions"
+
+    scope = Column(String, primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    fingerprint = Column(String(64), nullable=False)
+    # Both stay NULL while the original request is still running.
+    status_code = Column(Integer)
+    response_body = Column(LargeBinary)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,95 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Sequence
+
+from fastapi import HTTPException, Query, Request, Response
+from sqlalchemy import Select, and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class PageParams:
+    """
+    Query parameters for keyset-paginated list endpoints. Bodies stay plain
+    JSON arrays; the cursor for the next page is returned in the
+    ``X-Next-Cursor`` header and as a ``Link: rel="next"`` URL.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        cursor: str | None = Query(None, description="Opaque cursor from the previous page's X-Next-Cursor header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.request = request
+        self.response = response
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(values: Sequence) -> str:
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, columns: Sequence) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else value
+            for column, value in zip(columns, values)
+        ]
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+
+def _after(columns: Sequence, values: Sequence):
+    """Rows strictly after ``values`` in descending (col1, col2, ...) order."""
+    column, value = columns[0], values[0]
+    if len(columns) == 1:
+        return column < value
+    return or_(column < value, and_(column == value, _after(columns[1:], values[1:])))
+
+
+async def paginate(
+    db: AsyncSession, query: Select, order_by: Sequence, page: PageParams, as_rows: bool = False
+) -> list:
+    """
+    Return one page of ``query`` ordered by ``order_by`` descending. The last
+    column must be unique (normally the primary key) so the order is total and
+    a row is never skipped or repeated between pages. With ``as_rows`` the
+    page holds ``Row`` tuples of a column select instead of ORM objects.
+    """
+    if page.cursor:
+        query = query.where(_after(order_by, decode_cursor(page.cursor, order_by)))
+    query = query.order_by(*(column.desc() for column in order_by)).limit(page.limit + 1)
+
+    result = await db.execute(query)
+    rows = (result if as_rows else result.scalars()).all()
+    if len(rows) > page.limit:
+        rows = rows[: page.limit]
+        cursor = encode_cursor([getattr(rows[-1], column.key) for column in order_by])
+        next_url = page.request.url.include_query_params(cursor=cursor)
+        page.response.headers[NEXT_CURSOR_HEADER] = cursor
+        page.response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return rows
+
+
+def time_window(column, start: datetime | None, end: datetime | None) -> list:
+    """Half-open ``[start, end)`` filter on a timestamp column."""
+    clauses = []
+    if start is not None:
+        clauses.append(column >= start)
+    if end is not None:
+        clauses.append(column < end)
+    return clauses
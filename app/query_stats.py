@@ -0,0 +1,139 @@
+import json
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+EXPLAIN_PREFIXES = {
+    "sqlite": "EXPLAIN QUERY PLAN ",
+    "postgresql": "EXPLAIN ",
+}
+
+
+class RequestQueries:
+    __slots__ = ("count", "seconds", "shapes", "budget")
+
+    def __init__(self, budget: int):
+        self.count = 0
+        self.seconds = 0.0
+        self.shapes: Counter[str] = Counter()
+        self.budget = budget
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        return [(statement, runs) for statement, runs in self.shapes.most_common() if runs >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.seconds * 1000:.1f};desc="{self.count} queries"'
+
+
+_current: ContextVar[RequestQueries | None] = ContextVar("request_queries", default=None)
+
+
+def current_queries() -> RequestQueries | None:
+    return _current.get()
+
+
+def query_budget(limit: int):
+    """Route dependency overriding ``SQL_QUERY_BUDGET`` for one endpoint."""
+
+    async def apply_budget():
+        queries = _current.get()
+        if queries is not None:
+            queries.budget = limit
+
+    return apply_budget
+
+
+def _explain(conn, statement: str, parameters) -> str:
+    prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+    if prefix is None:
+        return "(no EXPLAIN support for this dialect)"
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute(prefix + statement, parameters)
+        return "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+    except Exception as exc:  # the plan is best effort; never fail the query it describes
+        return f"(EXPLAIN failed: {exc})"
+    finally:
+        cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.count += 1
+        queries.seconds += elapsed
+        queries.shapes[statement] += 1
+
+    if elapsed * 1000 >= settings.SQL_SLOW_QUERY_MS:
+        plan = ""
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            plan = _explain(conn, statement, parameters)
+        logger.warning("Slow query (%.1f ms): %s\nPlan:\n%s", elapsed * 1000, statement, plan)
+
+
+class QueryStatsMiddleware:
+    """
+    Count the queries each request runs before its response starts, report
+    them in ``Server-Timing``, and flag statements repeated within the request
+    (the usual sign of an N+1 loop). With ``SQL_QUERY_BUDGET_STRICT`` a
+    request over its budget is answered with 500, so tests catch regressions.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        queries = RequestQueries(settings.SQL_QUERY_BUDGET)
+        token = _current.set(queries)
+        suppress_body = False
+
+        async def send_with_timing(message):
+            nonlocal suppress_body
+            if message["type"] == "http.response.start":
+                route = getattr(scope.get("route"), "path", scope["path"])
+                for statement, runs in queries.repeated(settings.SQL_REPEATED_STATEMENT_THRESHOLD):
+                    logger.warning("%s %s ran the same statement %d times: %s", scope["method"], route, runs, statement)
+                if queries.count > queries.budget:
+                    logger.warning(
+                        "%s %s ran %d queries (budget %d)", scope["method"], route, queries.count, queries.budget
+                    )
+                    if settings.SQL_QUERY_BUDGET_STRICT:
+                        suppress_body = True
+                        body = json.dumps(
+                            {"detail": f"Query budget exceeded: {queries.count} > {queries.budget} on {route}"}
+                        ).encode()
+                        await send({
+                            "type": "http.response.start",
+                            "status": 500,
+                            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+                        })
+                        await send({"type": "http.response.body", "body": body})
+                        return
+                message["headers"] = [*message.get("headers", []), (b"server-timing", queries.server_timing().encode())]
+            elif suppress_body:
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
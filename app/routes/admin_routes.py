@@ -1,13 +1,23 @@
 import datetime
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app import models, schemas
+from collections import defaultdict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+from app import change_versions, daily_rollups, exports, models, schemas, slot_ledger, stats_counters
+from app.events import ADMIN_CHANNEL, event_bus, event_stream
+from app.serialization import fast_page
+from app.config import settings
 from app.database import get_db
-from app.auth.dependencies import get_current_admin_user, admin_required
-from app.auth.hashing import get_password_hash
+from app.auth.dependencies import TokenIdentity, get_current_admin_user, get_current_user, get_events_admin, admin_required
+from app.auth.jwt_handler import create_events_token
+from app.auth.token_service import revoke_refresh_tokens
+from app.auth.token_versions import forget_user, revoke_access_tokens
+from app.auth.hashing import hash_metrics, hash_password_async
+from app.availability_cache import availability_cache
+from app.pagination import PageParams, paginate, time_window
+from app.query_stats import query_budget
 from typing import List
-import json
 
 router = APIRouter(
     prefix="/admin",
@@ -15,74 +25,175 @@ router = APIRouter(
 )
 
 @router.get("/dashboard")
-def get_admin_dashboard(current_user=Depends(admin_required)):
+async def get_admin_dashboard(
+    current_admin: TokenIdentity = Depends(admin_required),
+    current_user: models.User = Depends(get_current_user),
+):
     return {"message": f"Welcome, {current_user.name}. You're an admin."}
 
-@router.get("/users", response_model=List[schemas.UserAdmin])
-def get_all_users(db: Session = Depends(get_db), current_user: models.User = Depends(admin_required)):
-    return db.query(models.User).all()
+def users_query(
+    is_admin: bool | None = None,
+    email: str | None = None,
+    created_from: datetime.datetime | None = None,
+    created_to: datetime.datetime | None = None,
+):
+    query = select(models.User).where(*time_window(models.User.created_at, created_from, created_to))
+    if is_admin is not None:
+        query = query.where(models.User.is_admin == is_admin)
+    if email:
+        query = query.where(models.User.email == email)
+    return query
 
-@router.get("/overview", response_model=List[schemas.UserOverview])
-def get_admin_user_overview(
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+@router.get("/users", response_model=List[schemas.UserAdmin])
+async def get_all_users(
+    query=Depends(users_query),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(admin_required)
+):
+    return await fast_page(db, query, (models.User.id,), page, schemas.UserAdmin)
+
+@router.get("/overview", response_model=List[schemas.UserOverview], dependencies=[Depends(query_budget(3))])
+async def get_admin_user_overview(
+    bookings_per_user: int | None = Query(None, ge=1, le=100, description="Only include each user's latest bookings"),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    users = db.query(models.User).all()
-    user_overviews = []
-    for user in users:
-        bookings = db.query(models.Booking).filter(models.Booking.user_id == user.id).all()
-        booking_summaries = [
+    """One query for the page of users and one for all of their bookings."""
+    users = await paginate(db, select(models.User), (models.User.id,), page)
+    if not users:
+        return []
+
+    booking_columns = (
+        models.Booking.id,
+        models.Booking.user_id,
+        models.Booking.date_time,
+        models.Booking.people,
+        models.Booking.info_message,
+    )
+    bookings_query = select(*booking_columns).where(models.Booking.user_id.in_([user.id for user in users]))
+    if bookings_per_user:
+        rank = func.row_number().over(
+            partition_by=models.Booking.user_id,
+            order_by=(models.Booking.date_time.desc(), models.Booking.id.desc()),
+        )
+        ranked = bookings_query.add_columns(rank.label("rank")).subquery()
+        bookings_query = select(*(ranked.c[column.key] for column in booking_columns)).where(
+            ranked.c.rank <= bookings_per_user
+        )
+        order = (ranked.c.date_time.desc(), ranked.c.id.desc())
+    else:
+        order = (models.Booking.date_time.desc(), models.Booking.id.desc())
+
+    summaries = defaultdict(list)
+    for row in await db.execute(bookings_query.order_by(*order)):
+        summaries[row.user_id].append(
             schemas.BookingSummary(
-                id=b.id,
-                date_time=b.date_time,
-                people=b.people,
-                info_message=b.info_message
-            ) for b in bookings
-        ]
-        user_overviews.append(
-            schemas.UserOverview(
-                id=user.id,
-                name=user.name,
-                surname=user.surname,
-                email=user.email,
-                phone=user.phone,
-                is_admin=user.is_admin,
-                bookings=booking_summaries
+                id=row.id,
+                date_time=row.date_time,
+                people=row.people,
+                info_message=row.info_message
             )
         )
-    return user_overviews
 
-@router.get("/bookings", response_model=List[schemas.Booking])
-def get_all_bookings(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(admin_required)
+    return [
+        schemas.UserOverview(
+            id=user.id,
+            name=user.name,
+            surname=user.surname,
+            email=user.email,
+            phone=user.phone,
+            is_admin=user.is_admin,
+            bookings=summaries[user.id]
+        )
+        for user in users
+    ]
+
+def bookings_query(
+    date_from: datetime.datetime | None = None,
+    date_to: datetime.datetime | None = None,
+    experience_type: str | None = None,
+    user_id: int | None = None,
+    guest_email: str | None = None,
+    created_from: datetime.datetime | None = None,
+    created_to: datetime.datetime | None = None,
+):
+    query = select(models.Booking).where(
+        *time_window(models.Booking.date_time, date_from, date_to),
+        *time_window(models.Booking.created_at, created_from, created_to),
+    )
+    if experience_type:
+        query = query.where(models.Booking.experience_type == experience_type)
+    if user_id is not None:
+        query = query.where(models.Booking.user_id == user_id)
+    if guest_email:
+        query = query.where(models.Booking.guests.any(models.BookingGuest.email == guest_email))
+    return query
+
+@router.get("/bookings", response_model=List[schemas.Booking], dependencies=[Depends(query_budget(4))])
+async def get_all_bookings(
+    query=Depends(bookings_query),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(admin_required)
 ):
-    return db.query(models.Booking).all()
+    version = await change_versions.get_version(db, change_versions.BOOKINGS_SCOPE)
+    etag = change_versions.make_etag(page.request, change_versions.BOOKINGS_SCOPE, version)
+    if (cached := change_versions.not_modified(page.request, page.response, etag)) is not None:
+        return cached
+    return await fast_page(db, query, (models.Booking.date_time, models.Booking.id), page, schemas.Booking)
 
 @router.get("/deleted-users", response_model=List[schemas.DeletedUser])
-def get_deleted_users(
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+async def get_deleted_users(
+    user_id: int | None = None,
+    deleted_from: datetime.datetime | None = None,
+    deleted_to: datetime.datetime | None = None,
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    query = select(models.DeletedUser).where(
+        *time_window(models.DeletedUser.deleted_at, deleted_from, deleted_to)
+    )
+    if user_id is not None:
+        query = query.where(models.DeletedUser.user_id == user_id)
+    return await paginate(db, query, (models.DeletedUser.id,), page)
+
+def deleted_bookings_query(
+    date_from: datetime.datetime | None = None,
+    date_to: datetime.datetime | None = None,
+    user_id: int | None = None,
+    deleted_from: datetime.datetime | None = None,
+    deleted_to: datetime.datetime | None = None,
 ):
-    return db.query(models.DeletedUser).all()
+    query = select(models.DeletedBooking).where(
+        *time_window(models.DeletedBooking.date_time, date_from, date_to),
+        *time_window(models.DeletedBooking.deleted_at, deleted_from, deleted_to),
+    )
+    if user_id is not None:
+        query = query.where(models.DeletedBooking.user_id == user_id)
+    return query
 
 @router.get("/deleted-bookings", response_model=List[schemas.DeletedBooking])
-def get_deleted_bookings(
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+async def get_deleted_bookings(
+    query=Depends(deleted_bookings_query),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    return db.query(models.DeletedBooking).all()
+    return await fast_page(db, query, (models.DeletedBooking.id,), page, schemas.DeletedBooking)
 
 @router.get("/users/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db), current_admin=Depends(get_current_admin_user)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def get_user(user_id: int, db: AsyncSession = Depends(get_db), current_admin=Depends(get_current_admin_user)):
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 @router.delete("/users/{user_id}")
-def delete_user(user_id: int, db: Session = Depends(get_db), current_admin=Depends(get_current_admin_user)):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+async def delete_user(user_id: int, db: AsyncSession = Depends(get_db), current_admin=Depends(get_current_admin_user)):
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -96,17 +207,18 @@ def delete_user(user_id: int, db: Session = Depends(get_db), current_admin=Depen
     )
 
     db.add(deleted_user)
-    db.delete(user)
-    db.commit()
+    forget_user(db, user.id)
+    await db.delete(user)
+    await db.commit()
     return {"detail": f"User {user_id} deleted."}
 
 @router.delete("/bookings/{booking_id}")
-def delete_booking_as_admin(
+async def delete_booking_as_admin(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await db.get(models.Booking, booking_id, options=[joinedload(models.Booking.user)])
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
@@ -114,6 +226,7 @@ def delete_booking_as_admin(
         booking_id=booking.id,
         date_time=booking.date_time,
         people=booking.people,
+        experience_type=booking.experience_type,
         info_message=booking.info_message,
         user_id=booking.user.id,
         user_name=booking.user.name,
@@ -124,121 +237,261 @@ def delete_booking_as_admin(
     )
 
     db.add(deleted_booking)
-    db.delete(booking)
-    db.commit()
+    await slot_ledger.release_seats(db, booking.date_time, booking.experience_type, booking.people)
+    await db.delete(booking)
+    await db.commit()
     return {"detail": f"Booking {booking_id} deleted by admin."}
 
 @router.put("/users/{user_id}", response_model=schemas.UserAdmin)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: schemas.UserUpdate,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    for key, value in user_update.dict(exclude_unset=True).items():
+    changes = user_update.dict(exclude_unset=True)
+    if "is_admin" in changes and bool(changes["is_admin"]) != bool(user.is_admin):
+        revoke_access_tokens(db, user)
+    for key, value in changes.items():
         setattr(user, key, value)
 
-    db.commit()
-    db.refresh(user)
+    await db.commit()
+    await db.refresh(user)
     return user
 
 
 @router.post("/users/{user_id}/password")
-def reset_user_password(
+async def reset_user_password(
     user_id: int,
     request: schemas.AdminPasswordResetRequest,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.password = get_password_hash(request.new_password)
-    db.commit()
+    user.password = await hash_password_async(request.new_password)
+    revoke_access_tokens(db, user)
+    await revoke_refresh_tokens(db, user.id)
+    await db.commit()
     return {"detail": f"Password reset for user {user_id}"}
 
 @router.put("/bookings/{booking_id}", response_model=schemas.Booking)
-def update_any_booking(
+async def update_any_booking(
     booking_id: int,
     booking_update: schemas.BookingUpdate,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    booking = db.query(models.Booking).filter(models.Booking.id == booking_id).first()
+    booking = await db.get(models.Booking, booking_id)
     if not booking:
         raise HTTPException(status_code=404, detail="Booking not found")
 
+    old_slot = (booking.date_time, booking.experience_type, booking.people)
     for key, value in booking_update.dict(exclude_unset=True).items():
-        if key == "guest_contacts":
-            value = json.dumps(value) if value else None
+        if key == "date_time" and value is not None:
+            value = slot_ledger.booking_slot_time(value)
         setattr(booking, key, value)
+    await slot_ledger.move_seats(db, *old_slot, booking.date_time, booking.experience_type, booking.people)
 
-    db.commit()
-    db.refresh(booking)
+    await db.commit()
+    await db.refresh(booking)
     return booking
 
 @router.get("/stats")
-def get_admin_statistics(
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+async def get_admin_statistics(
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    total_users = db.query(models.User).count()
-    total_admins = db.query(models.User).filter(models.User.is_admin == True).count()
-    total_bookings = db.query(models.Booking).count()
-    deleted_users = db.query(models.DeletedUser).count()
-    deleted_bookings = db.query(models.DeletedBooking).count()
+    await stats_counters.fold_pending()
+    stats = await db.get(models.AdminStats, stats_counters.STATS_ROW_ID)
+    if stats is None:
+        stats = await db.run_sync(stats_counters.rebuild_stats)
+        await db.commit()
 
     return {
-        "total_users": total_users,
-        "total_admins": total_admins,
-        "total_regular_users": total_users - total_admins,
-        "active_bookings": total_bookings,
-        "deleted_users": deleted_users,
-        "deleted_bookings": deleted_bookings
+        "total_users": stats.users,
+        "total_admins": stats.admins,
+        "total_regular_users": stats.users - stats.admins,
+        "active_bookings": stats.bookings,
+        "deleted_users": stats.deleted_users,
+        "deleted_bookings": stats.deleted_bookings,
+        "pending_update_requests": stats.pending_update_requests,
     }
 
 
-@router.get("/booking-update-requests", response_model=List[schemas.BookingUpdateRequest])
-def list_booking_update_requests(
+@router.post("/events/token")
+async def issue_events_token(current_admin: TokenIdentity = Depends(get_current_admin_user)):
+    """Short-lived token for ``GET /admin/events?token=...``, since ``EventSource`` cannot send headers."""
+    return {"token": create_events_token(current_admin), "expires_in": settings.EVENTS_TOKEN_TTL_SECONDS}
+
+
+@router.get("/events")
+async def stream_admin_events(current_admin: TokenIdentity = Depends(get_events_admin)):
+    """
+    Server-Sent Events for the dashboard: ``booking`` (created, updated,
+    deleted) and ``update_request`` (created, then approved or rejected).
+    The token is only checked when the stream opens.
+    """
+    return event_stream(event_bus.subscribe(ADMIN_CHANNEL))
+
+
+@router.get("/cache-stats")
+async def get_cache_statistics(current_admin: TokenIdentity = Depends(get_current_admin_user)):
+    return {"availability": availability_cache.stats()}
+
+
+@router.get("/hashing-stats")
+async def get_hashing_statistics(current_admin: TokenIdentity = Depends(get_current_admin_user)):
+    return hash_metrics.snapshot()
+
+
+def update_requests_query(
     status: str | None = None,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    booking_id: int | None = None,
+    user_id: int | None = None,
+    created_from: datetime.datetime | None = None,
+    created_to: datetime.datetime | None = None,
 ):
-    query = db.query(models.BookingUpdateRequest)
+    query = select(models.BookingUpdateRequest).where(
+        *time_window(models.BookingUpdateRequest.created_at, created_from, created_to)
+    )
     if status:
-        query = query.filter(models.BookingUpdateRequest.status == status)
-    return query.order_by(models.BookingUpdateRequest.created_at.desc()).all()
+        query = query.where(models.BookingUpdateRequest.status == status)
+    if booking_id is not None:
+        query = query.where(models.BookingUpdateRequest.booking_id == booking_id)
+    if user_id is not None:
+        query = query.where(models.BookingUpdateRequest.user_id == user_id)
+    return query
+
+
+@router.get("/booking-update-requests", response_model=List[schemas.BookingUpdateRequest])
+async def list_booking_update_requests(
+    query=Depends(update_requests_query),
+    page: PageParams = Depends(),
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    return await fast_page(
+        db,
+        query,
+        (models.BookingUpdateRequest.created_at, models.BookingUpdateRequest.id),
+        page,
+        schemas.BookingUpdateRequest,
+    )
+
+
+@router.put("/booking-update-requests/batch", response_model=schemas.BookingUpdateBatchResult)
+async def resolve_booking_update_requests_batch(
+    batch: schemas.BookingUpdateBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    """
+    Approve or reject many update requests with one query for the requests,
+    one for their bookings and a single commit. Items that can't be applied
+    (missing, already processed, no seats) are reported and skipped.
+    """
+    ids = [decision.id for decision in batch.decisions]
+    requests = {
+        request.id: request
+        for request in await db.scalars(
+            select(models.BookingUpdateRequest).where(models.BookingUpdateRequest.id.in_(ids))
+        )
+    }
+    approved_booking_ids = {
+        requests[decision.id].booking_id
+        for decision in batch.decisions
+        if decision.status == "approved" and decision.id in requests
+    }
+    bookings = {
+        booking.id: booking
+        for booking in (
+            await db.scalars(select(models.Booking).where(models.Booking.id.in_(approved_booking_ids)))
+            if approved_booking_ids
+            else []
+        )
+    }
+
+    now = datetime.datetime.utcnow()
+    seen = set()
+    results = []
+    for decision in batch.decisions:
+        update_request = requests.get(decision.id)
+        error = None
+        if decision.id in seen:
+            error = "Duplicate request id in batch"
+        elif update_request is None:
+            error = "Booking update request not found"
+        elif update_request.status != "pending":
+            error = "Request has already been processed"
+        seen.add(decision.id)
+
+        if error is None and decision.status == "approved":
+            booking = bookings.get(update_request.booking_id)
+            if booking is None:
+                error = "Associated booking not found"
+            else:
+                new_people = update_request.requested_people or booking.people
+                try:
+                    new_date_time = booking.date_time
+                    if update_request.requested_date_time:
+                        new_date_time = slot_ledger.booking_slot_time(update_request.requested_date_time)
+                    await slot_ledger.move_seats(
+                        db,
+                        booking.date_time, booking.experience_type, booking.people,
+                        new_date_time, booking.experience_type, new_people,
+                    )
+                except HTTPException as exc:
+                    error = exc.detail
+                else:
+                    booking.date_time = new_date_time
+                    booking.people = new_people
+                    if update_request.requested_info_message is not None:
+                        booking.info_message = update_request.requested_info_message
+
+        if error is not None:
+            results.append(schemas.BookingUpdateBatchItemResult(id=decision.id, outcome="failed", error=error))
+            continue
+
+        update_request.status = decision.status
+        update_request.admin_note = decision.admin_note
+        update_request.processed_at = now
+        update_request.updated_at = now
+        results.append(
+            schemas.BookingUpdateBatchItemResult(id=decision.id, outcome=decision.status, request=update_request)
+        )
+
+    await db.commit()
+    failed = sum(result.outcome == "failed" for result in results)
+    return schemas.BookingUpdateBatchResult(processed=len(results) - failed, failed=failed, results=results)
 
 
 @router.get("/booking-update-requests/{request_id}", response_model=schemas.BookingUpdateRequest)
-def get_booking_update_request(
+async def get_booking_update_request(
     request_id: int,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    request = db.query(models.BookingUpdateRequest).filter(models.BookingUpdateRequest.id == request_id).first()
+    request = await db.get(models.BookingUpdateRequest, request_id)
     if not request:
         raise HTTPException(status_code=404, detail="Booking update request not found")
     return request
 
 
 @router.put("/booking-update-requests/{request_id}", response_model=schemas.BookingUpdateRequest)
-def resolve_booking_update_request(
+async def resolve_booking_update_request(
     request_id: int,
     decision: schemas.BookingUpdateDecision,
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
-    update_request = (
-        db.query(models.BookingUpdateRequest)
-        .filter(models.BookingUpdateRequest.id == request_id)
-        .first()
-    )
+    update_request = await db.get(models.BookingUpdateRequest, request_id)
 
     if not update_request:
         raise HTTPException(status_code=404, detail="Booking update request not found")
@@ -247,79 +500,133 @@ def resolve_booking_update_request(
         raise HTTPException(status_code=400, detail="Request has already been processed")
 
     if decision.status == "approved":
-        booking = (
-            db.query(models.Booking)
-            .filter(models.Booking.id == update_request.booking_id)
-            .first()
-        )
+        booking = await db.get(models.Booking, update_request.booking_id)
         if not booking:
             raise HTTPException(status_code=404, detail="Associated booking not found")
 
+        old_slot = (booking.date_time, booking.experience_type, booking.people)
         if update_request.requested_date_time:
-            booking.date_time = update_request.requested_date_time
+            booking.date_time = slot_ledger.booking_slot_time(update_request.requested_date_time)
         if update_request.requested_people:
             booking.people = update_request.requested_people
         if update_request.requested_info_message is not None:
             booking.info_message = update_request.requested_info_message
+        await slot_ledger.move_seats(db, *old_slot, booking.date_time, booking.experience_type, booking.people)
 
     update_request.status = decision.status
     update_request.admin_note = decision.admin_note
     update_request.processed_at = datetime.datetime.utcnow()
 
-    db.commit()
-    db.refresh(update_request)
+    await db.commit()
+    await db.refresh(update_request)
     return update_request
 
 @router.get("/trends")
-def get_trends(
-    db: Session = Depends(get_db),
-    current_admin: models.User = Depends(get_current_admin_user)
+async def get_trends(
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
 ):
     today = datetime.date.today()
     one_week_ago = today - datetime.timedelta(days=7)
     one_month_ago = today - datetime.timedelta(days=30)
-    week_start = datetime.datetime.combine(one_week_ago, datetime.datetime.min.time())
-    month_start = datetime.datetime.combine(one_month_ago, datetime.datetime.min.time())
-
-    weekly_user_signups = db.query(
-        func.strftime('%Y-%m-%d', models.User.created_at).label('date'),
-        func.count(models.User.id)
-    ).filter(
-        models.User.created_at >= week_start
-    ).group_by('date').all()
-
-    monthly_user_signups = db.query(
-        func.strftime('%Y-%m', models.User.created_at).label('month'),
-        func.count(models.User.id)
-    ).filter(
-        models.User.created_at >= month_start
-    ).group_by('month').all()
-
-    weekly_bookings = db.query(
-        func.strftime('%Y-%m-%d', models.Booking.date_time).label('date'),
-        func.count(models.Booking.id)
-    ).filter(
-        models.Booking.date_time >= week_start
-    ).group_by('date').all()
-
-    monthly_bookings = db.query(
-        func.strftime('%Y-%m', models.Booking.date_time).label('month'),
-        func.count(models.Booking.id)
-    ).filter(
-        models.Booking.date_time >= month_start
-    ).group_by('month').all()
+
+    weekly = await daily_rollups.load_series(db, "day", one_week_ago)
+    monthly = await daily_rollups.load_series(db, "month", one_month_ago)
 
     return {
         "weekly_user_signups": [
-            {"date": row[0], "count": row[1]} for row in weekly_user_signups
+            {"date": period, "count": row["signups"]} for period, row in weekly.items() if row["signups"]
         ],
         "monthly_user_signups": [
-            {"month": row[0], "count": row[1]} for row in monthly_user_signups
+            {"month": period, "count": row["signups"]} for period, row in monthly.items() if row["signups"]
         ],
         "weekly_bookings": [
-            {"date": row[0], "count": row[1]} for row in weekly_bookings
+            {"date": period, "count": row["bookings"]} for period, row in weekly.items() if row["bookings"]
         ],
         "monthly_bookings": [
-            {"month": row[0], "count": row[1]} for row in monthly_bookings
+            {"month": period, "count": row["bookings"]} for period, row in monthly.items() if row["bookings"]
         ],
     }
+
+
+@router.get("/trends/series")
+async def get_trend_series(
+    start: datetime.date,
+    end: datetime.date,
+    bucket: str = Query("month", pattern=f"^({'|'.join(daily_rollups.BUCKETS)})$"),
+    experience_type: str | None = None,
+    db: AsyncSession = Depends(get_db),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+
+    series = await daily_rollups.load_series(db, bucket, start, end, experience_type)
+    return {
+        "bucket": bucket,
+        "start": start,
+        "end": end,
+        "experience_type": experience_type,
+        "series": [{"period": period, **row} for period, row in series.items()],
+    }
+
+
+EXPORT_FORMAT_PATTERN = f"^({'|'.join(exports.EXPORT_FORMATS)})$"
+
+
+@router.get("/export/bookings")
+async def export_bookings(
+    query=Depends(bookings_query),
+    since: datetime.datetime | None = Query(None, description="Only bookings created at or after this time"),
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    return exports.export_response(
+        "bookings", query, (models.Booking.created_at, models.Booking.id), schemas.Booking, format, since
+    )
+
+
+@router.get("/export/deleted-bookings")
+async def export_deleted_bookings(
+    query=Depends(deleted_bookings_query),
+    since: datetime.datetime | None = Query(None, description="Only bookings deleted at or after this time"),
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    return exports.export_response(
+        "deleted-bookings",
+        query,
+        (models.DeletedBooking.deleted_at, models.DeletedBooking.id),
+        schemas.DeletedBooking,
+        format,
+        since,
+    )
+
+
+@router.get("/export/users")
+async def export_users(
+    query=Depends(users_query),
+    since: datetime.datetime | None = Query(None, description="Only users created at or after this time"),
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    return exports.export_response(
+        "users", query, (models.User.created_at, models.User.id), schemas.UserAdmin, format, since
+    )
+
+
+@router.get("/export/update-requests")
+async def export_update_requests(
+    query=Depends(update_requests_query),
+    since: datetime.datetime | None = Query(None, description="Only requests updated at or after this time"),
+    format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN),
+    current_admin: TokenIdentity = Depends(get_current_admin_user)
+):
+    return exports.export_response(
+        "update-requests",
+        query,
+        (models.BookingUpdateRequest.updated_at, models.BookingUpdateRequest.id),
+        schemas.BookingUpdateRequest,
+        format,
+        since,
+    )
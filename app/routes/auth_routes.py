@@ -1,10 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import OAuth2PasswordRequestForm
 
 from .. import models, database, schemas
-from ..auth.hashing import verify_password
-from ..auth.jwt_handler import create_access_token
+from ..auth.hashing import verify_and_update_password_async
+from ..auth.jwt_handler import create_user_access_token
 from app.database import get_db
 from app.auth.token_service import (
     issue_refresh_token,
@@ -12,37 +13,54 @@ from app.auth.token_service import (
     rotate_refresh_token,
 )
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(models.User).filter(models.User.email == email).first()
-    if not user or not verify_password(password, user.password):
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    user = (await db.scalars(select(models.User).where(models.User.email == email))).first()
+    if not user:
+        return None
+    verified, new_hash = await verify_and_update_password_async(password, user.password)
+    if not verified:
         return None
+    if new_hash:
+        # Stored hash predates the configured cost factor; persisted with the login commit.
+        user.password = new_hash
     return user
 
 router = APIRouter()
 
 @router.post("/token", response_model=schemas.Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(database.get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(database.get_db)):
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect username or password")
 
-    access_token = create_access_token(data={"sub": user.email})
-    refresh_token, _ = issue_refresh_token(db, user.id)
-    db.commit()
+    access_token = create_user_access_token(user)
+    refresh_token, _ = await issue_refresh_token(db, user.id)
+    await db.commit()
     return schemas.Token(access_token=access_token, refresh_token=refresh_token)
 
 
 @router.post("/token/refresh", response_model=schemas.Token)
-def refresh_access_token(payload: schemas.TokenRefreshRequest, db: Session = Depends(get_db)):
-    stored_refresh = get_valid_refresh_token(db, payload.refresh_token)
+async def refresh_access_token(payload: schemas.TokenRefreshRequest, db: AsyncSession = Depends(get_db)):
+    stored_refresh = await get_valid_refresh_token(db, payload.refresh_token)
     if not stored_refresh:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid or expired refresh token",
         )
 
-    user = stored_refresh.user
-    access_token = create_access_token(data={"sub": user.email})
-    new_refresh_token, _ = rotate_refresh_token(db, stored_refresh)
-    db.commit()
+    user = await db.get(models.User, stored_refresh.user_id)
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    rotated = await rotate_refresh_token(db, stored_refresh)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    new_refresh_token, _ = rotated
+    access_token = create_user_access_token(user)
+    await db.commit()
     return schemas.Token(access_token=access_token, refresh_token=new_refresh_token)
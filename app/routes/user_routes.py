@@ -1,21 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app import models, schemas
+from app import change_versions, models, schemas
 from app.database import get_db
-from app.auth.hashing import get_password_hash, verify_password
-from app.auth.dependencies import get_current_user, get_current_admin_user
+from app.query_stats import query_budget
+from app.auth.hashing import hash_password_async, verify_password_async
+from app.auth.dependencies import TokenIdentity, get_current_identity, get_current_user
+from app.auth.token_service import revoke_refresh_tokens
+from app.auth.token_versions import revoke_access_tokens
 
 router = APIRouter()
 
 @router.post("/users/", response_model=schemas.User)
-def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
-    existing_user = db.query(models.User).filter(models.User.email == user.email).first()
+async def create_user(user: schemas.UserCreate, db: AsyncSession = Depends(get_db)):
+    existing_user = (
+        await db.scalars(select(models.User).where(models.User.email == user.email))
+    ).first()
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await hash_password_async(user.password)
     db_user = models.User(
         name=user.name,
         surname=user.surname,
@@ -24,62 +30,74 @@ def create_user(user: schemas.UserCreate, db: Session = Depends(get_db)):
         password=hashed_password
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     return db_user
 
 @router.get("/users/me", response_model=schemas.CurrentUser)
-def get_my_profile(current_user: models.User = Depends(get_current_user)):
+async def get_my_profile(current_user: models.User = Depends(get_current_user)):
     return current_user
 
 @router.get("/users/{user_id:int}/bookings", response_model=List[schemas.Booking])
-def get_user_bookings(user_id: int, db: Session = Depends(get_db)):
-    bookings = db.query(models.Booking).filter(models.Booking.user_id == user_id).all()
+async def get_user_bookings(user_id: int, db: AsyncSession = Depends(get_db)):
+    bookings = (
+        await db.scalars(select(models.Booking).where(models.Booking.user_id == user_id))
+    ).all()
     return bookings
 
 
 @router.post("/users/me/password")
-def change_my_password(
+async def change_my_password(
     payload: schemas.PasswordChangeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
-    if not verify_password(payload.current_password, current_user.password):
+    if not await verify_password_async(payload.current_password, current_user.password):
         raise HTTPException(status_code=400, detail="Incorrect current password")
 
-    current_user.password = get_password_hash(payload.new_password)
-    db.commit()
+    current_user.password = await hash_password_async(payload.new_password)
+    revoke_access_tokens(db, current_user)
+    await revoke_refresh_tokens(db, current_user.id)
+    await db.commit()
     return {"detail": "Password updated successfully"}
 
 @router.put("/users/me", response_model=schemas.User)
-def update_my_profile(
+async def update_my_profile(
     update_data: schemas.UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
     for field, value in update_data.dict(exclude_unset=True).items():
         setattr(current_user, field, value)
 
-    db.commit()
-    db.refresh(current_user)
+    await db.commit()
+    await db.refresh(current_user)
     return current_user
 
-@router.get("/users/me/bookings", response_model=List[schemas.Booking])
-def get_my_bookings(
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
+@router.get("/users/me/bookings", response_model=List[schemas.Booking], dependencies=[Depends(query_budget(4))])
+async def get_my_bookings(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity)
 ):
-    bookings = db.query(models.Booking).filter(models.Booking.user_id == current_user.id).all()
+    scope = change_versions.user_scope(change_versions.BOOKINGS_SCOPE, current_user.id)
+    etag = change_versions.make_etag(request, scope, await change_versions.get_version(db, scope))
+    if (cached := change_versions.not_modified(request, response, etag)) is not None:
+        return cached
+    bookings = (
+        await db.scalars(select(models.Booking).where(models.Booking.user_id == current_user.id))
+    ).all()
     return bookings
 
 
 @router.get("/users/{user_id:int}", response_model=schemas.User)
-def read_user(
+async def read_user(
     user_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: TokenIdentity = Depends(get_current_identity),
 ):
-    user = db.query(models.User).filter(models.User.id == user_id).first()
+    user = await db.get(models.User, user_id)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     if not current_user.is_admin and user.id != current_user.id:
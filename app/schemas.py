@@ -3,7 +3,6 @@ from __future__ import annotations
 from typing import List, Literal
 from pydantic import BaseModel, Field, field_validator, model_validator
 from datetime import datetime
-import json
 
 # ----------------- Auth -----------------
 
@@ -108,6 +107,17 @@ class DeletedUser(BaseModel):
         from_attributes = True
 # ----------------- Booking -----------------
 
+BOOKING_BATCH_MAX_ITEMS = 100
+
+BOOKING_SLOTS = (
+    (9, 0),
+    (10, 30),
+    (12, 0),
+    (15, 0),
+    (16, 30),
+    (18, 0),
+)
+
 class BookingCreate(BaseModel):
     date_time: datetime
     people: int = Field(..., gt=0)
@@ -129,16 +139,8 @@ class BookingCreate(BaseModel):
         if date_time is None:
             return values
 
-        allowed_slots = {
-            (9, 0),
-            (10, 30),
-            (12, 0),
-            (15, 0),
-            (16, 30),
-            (18, 0),
-        }
         hour_minute = (date_time.hour, date_time.minute)
-        if hour_minute not in allowed_slots:
+        if hour_minute not in BOOKING_SLOTS:
             raise ValueError("Choose one of the available slots: 09:00, 10:30, 12:00, 15:00, 16:30, 18:00")
         return values
 
@@ -155,21 +157,29 @@ class Booking(BaseModel):
     class Config:
         from_attributes = True
 
-    @field_validator("guest_contacts", mode="before")
-    @classmethod
-    def parse_guest_contacts(cls, value):
-        if value is None or value == "":
-            return None
-        if isinstance(value, list):
-            return value
-        try:
-            return json.loads(value)
-        except Exception:
-            return None
-        
+
+class BookingBatchCreate(BaseModel):
+    bookings: List[BookingCreate] = Field(..., min_length=1, max_length=BOOKING_BATCH_MAX_ITEMS)
+    # "atomic" creates every booking or none; "partial" creates what fits and reports the rest.
+    mode: Literal["atomic", "partial"] = "atomic"
+
+
+class BookingBatchItemResult(BaseModel):
+    index: int
+    status: Literal["created", "failed"]
+    booking: Booking | None = None
+    error: str | None = None
+
+
+class BookingBatchResult(BaseModel):
+    created: int
+    failed: int
+    results: List[BookingBatchItemResult]
+
+
 class BookingUpdate(BaseModel):
     date_time: datetime | None = None
-    people: int | None = None
+    people: int | None = Field(None, gt=0)
     info_message: str | None = None
     experience_type: Literal["guided_tour", "tour_tasting"] | None = None
     guest_contacts: List["GuestContact"] | None = None
@@ -237,12 +247,40 @@ class BookingUpdateDecision(BaseModel):
         if value not in allowed:
             raise ValueError(f"Status must be one of {', '.join(sorted(allowed))}")
         return value
+
+
+BOOKING_UPDATE_BATCH_MAX_ITEMS = 500
+
+
+class BookingUpdateBatchDecision(BookingUpdateDecision):
+    id: int
+
+
+class BookingUpdateBatchRequest(BaseModel):
+    decisions: List[BookingUpdateBatchDecision] = Field(
+        ..., min_length=1, max_length=BOOKING_UPDATE_BATCH_MAX_ITEMS
+    )
+
+
+class BookingUpdateBatchItemResult(BaseModel):
+    id: int
+    outcome: Literal["approved", "rejected", "failed"]
+    request: BookingUpdateRequest | None = None
+    error: str | None = None
+
+
+class BookingUpdateBatchResult(BaseModel):
+    processed: int
+    failed: int
+    results: List[BookingUpdateBatchItemResult]
+
            
 class DeletedBooking(BaseModel):
     id: int
     booking_id: int
     date_time: datetime
     people: int
+    experience_type: str | None = None
     info_message: str | None
     user_id: int
     user_name: str
@@ -0,0 +1,310 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, Iterator, NamedTuple
+from zoneinfo import ZoneInfo
+
+from fastapi import HTTPException
+from sqlalchemy import case, func, select, tuple_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.availability_cache import availability_cache, track_slot
+from app.database import upsert_insert
+
+EXPERIENCE_CAPACITY = {
+    "guided_tour": 20,
+    "tour_tasting": 12,
+}
+OPERATING_START_HOUR = 9
+OPERATING_START_MINUTE = 0
+OPERATING_END_HOUR = 19
+OPERATING_END_MINUTE = 30
+MUSEUM_TZ = ZoneInfo("Europe/Rome")
+
+
+class Occupancy(NamedTuple):
+    """A slot's ledger numbers; every reader returns them in this order."""
+
+    capacity: int
+    reserved: int
+
+
+def get_capacity(experience_type: str) -> int:
+    return EXPERIENCE_CAPACITY[experience_type]
+
+
+def empty_occupancy(experience_type: str) -> Occupancy:
+    return Occupancy(get_capacity(experience_type), 0)
+
+
+def normalize_slot(dt: datetime) -> datetime:
+    return dt.replace(second=0, microsecond=0)
+
+
+def to_local_naive(dt: datetime) -> datetime:
+    if dt.tzinfo is None:
+        return dt
+    return dt.astimezone(MUSEUM_TZ).replace(tzinfo=None)
+
+
+def ensure_within_operating_hours(dt: datetime):
+    dt_time = dt.time()
+    if dt_time.hour < OPERATING_START_HOUR or (
+        dt_time.hour == OPERATING_START_HOUR and dt_time.minute < OPERATING_START_MINUTE
+    ):
+        raise HTTPException(status_code=400, detail="Bookings start at 09:00")
+    if dt_time.hour > OPERATING_END_HOUR or (
+        dt_time.hour == OPERATING_END_HOUR and dt_time.minute > OPERATING_END_MINUTE
+    ):
+        raise HTTPException(status_code=400, detail="Last booking slot finishes at 19:30")
+
+
+def booking_slot_time(dt: datetime) -> datetime:
+    """
+    The ledger key for a requested booking time: museum-local, whole
+    minutes, on one of ``schemas.BOOKING_SLOTS``. Every path that moves
+    seats goes through this, so equal slots always share one ledger row.
+    """
+    slot_time = normalize_slot(to_local_naive(dt))
+    ensure_within_operating_hours(slot_time)
+    if (slot_time.hour, slot_time.minute) not in schemas.BOOKING_SLOTS:
+        slots = ", ".join(f"{hour:02d}:{minute:02d}" for hour, minute in schemas.BOOKING_SLOTS)
+        raise HTTPException(status_code=400, detail=f"Choose one of the available slots: {slots}")
+    return slot_time
+
+
+def slot_status(date_time: datetime, experience_type: str, capacity: int, booked: int) -> dict:
+    return {
+        "date_time": date_time,
+        "experience_type": experience_type,
+        "capacity": capacity,
+        "booked": booked,
+        "remaining": max(capacity - booked, 0),
+        "is_full": booked >= capacity,
+    }
+
+
+async def read_occupancy(db: AsyncSession, date_time: datetime, experience_type: str) -> Occupancy:
+    """Return a slot's occupancy, defaulting to an empty slot."""
+    row = (await db.execute(
+        select(models.SlotOccupancy.capacity, models.SlotOccupancy.reserved).where(
+            *_slot_filter(date_time, experience_type)
+        )
+    )).first()
+    if row is None:
+        return empty_occupancy(experience_type)
+    return Occupancy(row[0], row[1])
+
+
+def iter_slot_times(start: date, end: date) -> Iterator[datetime]:
+    """Yield every bookable slot start from ``start`` to ``end`` inclusive."""
+    day = start
+    while day <= end:
+        for hour, minute in schemas.BOOKING_SLOTS:
+            yield datetime.combine(day, time(hour, minute))
+        day += timedelta(days=1)
+
+
+async def get_slots_between(
+    db: AsyncSession,
+    start: datetime,
+    end: datetime,
+    experience_types: Iterable[str],
+) -> dict[tuple[datetime, str], Occupancy]:
+    """Return the occupancy of every ledger row in ``[start, end)`` in one query."""
+    rows = await db.execute(
+        select(
+            models.SlotOccupancy.date_time,
+            models.SlotOccupancy.experience_type,
+            models.SlotOccupancy.capacity,
+            models.SlotOccupancy.reserved,
+        ).where(
+            models.SlotOccupancy.date_time >= start,
+            models.SlotOccupancy.date_time < end,
+            models.SlotOccupancy.experience_type.in_(list(experience_types)),
+        )
+    )
+    return {(row[0], row[1]): Occupancy(row[2], row[3]) for row in rows}
+
+
+async def read_slots(
+    db: AsyncSession, slots: Iterable[tuple[datetime, str]]
+) -> dict[tuple[datetime, str], Occupancy]:
+    """Return the occupancy of each ``(date_time, experience_type)`` in one query."""
+    slots = set(slots)
+    rows = await db.execute(
+        select(
+            models.SlotOccupancy.date_time,
+            models.SlotOccupancy.experience_type,
+            models.SlotOccupancy.capacity,
+            models.SlotOccupancy.reserved,
+        ).where(tuple_(models.SlotOccupancy.date_time, models.SlotOccupancy.experience_type).in_(slots))
+    )
+    found = {(row[0], row[1]): Occupancy(row[2], row[3]) for row in rows}
+    return {slot: found.get(slot) or empty_occupancy(slot[1]) for slot in slots}
+
+
+def _slot_filter(date_time: datetime, experience_type: str):
+    return (
+        models.SlotOccupancy.date_time == date_time,
+        models.SlotOccupancy.experience_type == experience_type,
+    )
+
+
+async def _try_reserve(db: AsyncSession, date_time: datetime, experience_type: str, people: int) -> bool:
+    result = await db.execute(
+        update(models.SlotOccupancy)
+        .where(
+            *_slot_filter(date_time, experience_type),
+            models.SlotOccupancy.reserved + people <= models.SlotOccupancy.capacity,
+        )
+        .values(reserved=models.SlotOccupancy.reserved + people)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+
+async def reserve_seats(db: AsyncSession, date_time: datetime, experience_type: str, people: int):
+    """
+    Claim seats in a slot within the caller's transaction.
+    The capacity check and the increment are a single conditional UPDATE, so
+    concurrent bookings can never push a slot past its capacity.
+    """
+    if not people or people <= 0:
+        return
+    track_slot(db, date_time, experience_type)
+    if await _try_reserve(db, date_time, experience_type, people):
+        return
+
+    exists = (await db.execute(
+        select(models.SlotOccupancy.reserved).where(*_slot_filter(date_time, experience_type))
+    )).first()
+    if exists is None:
+        try:
+            async with db.begin_nested():
+                db.add(
+                    models.SlotOccupancy(
+                        date_time=date_time,
+                        experience_type=experience_type,
+                        reserved=0,
+                        capacity=get_capacity(experience_type),
+                    )
+                )
+        except IntegrityError:
+            # Another request created the slot row first; fall through to the update.
+            pass
+        if await _try_reserve(db, date_time, experience_type, people):
+            return
+
+    raise HTTPException(status_code=409, detail="Not enough seats available for this slot")
+
+
+async def reserve_many(db: AsyncSession, demands: dict[tuple[datetime, str], int]) -> set[tuple[datetime, str]]:
+    """
+    Claim seats in many slots at once: one statement creates any missing
+    ledger rows, then each slot gets a single conditional UPDATE. Returns
+    the slots that lacked room; their seats are not claimed.
+    """
+    # Slots are always locked in key order, so two batches sharing slots
+    # queue behind each other instead of deadlocking.
+    demands = dict(sorted(demands.items()))
+    make_insert = upsert_insert(db.bind.dialect.name)
+    if make_insert is not None:
+        await db.execute(
+            make_insert(models.SlotOccupancy)
+            .values([
+                {
+                    "date_time": date_time,
+                    "experience_type": experience_type,
+                    "reserved": 0,
+                    "capacity": get_capacity(experience_type),
+                }
+                for date_time, experience_type in demands
+            ])
+            .on_conflict_do_nothing()
+        )
+
+    failed = set()
+    for (date_time, experience_type), people in demands.items():
+        if make_insert is None:
+            try:
+                await reserve_seats(db, date_time, experience_type, people)
+            except HTTPException:
+                failed.add((date_time, experience_type))
+            continue
+        track_slot(db, date_time, experience_type)
+        if not await _try_reserve(db, date_time, experience_type, people):
+            failed.add((date_time, experience_type))
+    return failed
+
+
+async def release_seats(db: AsyncSession, date_time: datetime, experience_type: str, people: int):
+    if not people or people <= 0:
+        return
+    track_slot(db, date_time, experience_type)
+    reserved = models.SlotOccupancy.reserved
+    await db.execute(
+        update(models.SlotOccupancy)
+        .where(*_slot_filter(date_time, experience_type))
+        .values(reserved=case((reserved > people, reserved - people), else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def move_seats(
+    db: AsyncSession,
+    old_date_time: datetime,
+    old_experience_type: str,
+    old_people: int,
+    new_date_time: datetime,
+    new_experience_type: str,
+    new_people: int,
+):
+    """Re-point a booking's seats after its slot or party size changed."""
+    if (old_date_time, old_experience_type) == (new_date_time, new_experience_type):
+        delta = (new_people or 0) - (old_people or 0)
+        if delta > 0:
+            await reserve_seats(db, new_date_time, new_experience_type, delta)
+        elif delta < 0:
+            await release_seats(db, old_date_time, old_experience_type, -delta)
+        return
+
+    await reserve_seats(db, new_date_time, new_experience_type, new_people)
+    await release_seats(db, old_date_time, old_experience_type, old_people)
+
+
+def rebuild_ledger(db: Session):
+    """Recompute every slot from the bookings table (backfill or drift repair)."""
+    availability_cache.clear()
+    db.query(models.SlotOccupancy).delete(synchronize_session=False)
+    rows = (
+        db.query(
+            models.Booking.date_time,
+            models.Booking.experience_type,
+            func.sum(models.Booking.people),
+        )
+        .group_by(models.Booking.date_time, models.Booking.experience_type)
+        .all()
+    )
+    db.add_all(
+        models.SlotOccupancy(
+            date_time=date_time,
+            experience_type=experience_type,
+            reserved=reserved or 0,
+            capacity=get_capacity(experience_type),
+        )
+        for date_time, experience_type, reserved in rows
+    )
+    db.commit()
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        rebuild_ledger(db)
+        print("Slot ledger rebuilt from bookings")
+    finally:
+        db.close()
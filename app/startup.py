@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+
+class SchemaMismatchError(RuntimeError):
+    pass
+
+
+class StartupState:
+    """Phase timings for the readiness endpoint; ``ready`` flips once warm-up is done."""
+
+    def __init__(self, started: float):
+        self.started = started
+        self.ready = False
+        self.phases: dict[str, float] = {}
+        self.total_seconds: float | None = None
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round(time.perf_counter() - started, 4)
+
+    def mark_ready(self):
+        self.total_seconds = round(time.perf_counter() - self.started, 4)
+        budget = settings.STARTUP_BUDGET_SECONDS
+        if budget and self.total_seconds > budget:
+            message = f"Startup took {self.total_seconds:.2f}s, over the {budget:.2f}s budget: {self.phases}"
+            if settings.STARTUP_BUDGET_STRICT:
+                raise RuntimeError(message)
+            logger.warning(message)
+        else:
+            logger.info("Startup took %.2fs: %s", self.total_seconds, self.phases)
+        self.ready = True
+
+    def snapshot(self) -> dict:
+        return {
+            "ready": self.ready,
+            "total_seconds": self.total_seconds,
+            "budget_seconds": settings.STARTUP_BUDGET_SECONDS or None,
+            "phases": self.phases,
+        }
+
+
+def _alembic_config():
+    # Deferred: Alembic is only needed once per process, at startup.
+    from alembic.config import Config
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "alembic"))
+    return config
+
+
+def check_schema(connection):
+    """
+    Raise ``SchemaMismatchError`` unless the database is at the Alembic
+    head(s) and has a table for every model.
+    """
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    from app import models
+
+    expected = set(ScriptDirectory.from_config(_alembic_config()).get_heads())
+    current = set(MigrationContext.configure(connection).get_current_heads())
+    if current == expected:
+        missing = set(models.Base.metadata.tables) - set(inspect(connection).get_table_names())
+        if missing:
+            raise SchemaMismatchError(
+                f"Database is at the Alembic head but has no {', '.join(sorted(missing))} table; "
+                "it was migrated by a release whose migrations skipped it. "
+                "Create it with `python -m app.startup create-missing-tables`"
+            )
+        return
+    if current:
+        raise SchemaMismatchError(
+            f"Database is at revision {', '.join(sorted(current))} but the code expects "
+            f"{', '.join(sorted(expected))}; run `alembic upgrade head`"
+        )
+    if inspect(connection).get_table_names():
+        raise SchemaMismatchError(
+            "Database has tables but no Alembic revision; if they match the models, run `alembic stamp head`"
+        )
+    raise SchemaMismatchError("Database is empty; create it with `python -m app.startup init-db`")
+
+
+async def verify_schema(engine: AsyncEngine):
+    if settings.SCHEMA_CHECK == "off":
+        return
+    async with engine.connect() as connection:
+        try:
+            await connection.run_sync(check_schema)
+        except SchemaMismatchError as exc:
+            if settings.SCHEMA_CHECK == "strict":
+                raise
+            logger.warning("%s", exc)
+
+
+async def warm_database(engine: AsyncEngine, connections: int):
+    """Open ``connections`` pooled connections at once so first requests don't pay for connecting."""
+
+    async def touch():
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+
+    await asyncio.gather(*(touch() for _ in range(connections)))
+
+
+def init_db():
+    """Create every table on an empty database and stamp it at the Alembic head."""
+    from alembic.runtime.migration import MigrationContext
+    from alembic.script import ScriptDirectory
+
+    from app import models
+    from app.database import engine
+    from app.stats_counters import STATS_ROW_ID
+
+    with engine.begin() as connection:
+        if inspect(connection).get_table_names():
+            raise SystemExit("Database is not empty; use `alembic upgrade head` instead")
+        models.Base.metadata.create_all(bind=connection)
+        # Seeded here, as the migration does, so no write ever has to create it.
+        connection.execute(models.AdminStats.__table__.insert().values(id=STATS_ROW_ID))
+        MigrationContext.configure(connection).stamp(ScriptDirectory.from_config(_alembic_config()), "heads")
+
+
+def create_missing_tables() -> list[str]:
+    """Create model tables (with their indexes) that a database at the Alembic head lacks."""
+    from app import models
+    from app.database import engine
+
+    with engine.begin() as connection:
+        existing = set(inspect(connection).get_table_names())
+        missing = [table for name, table in models.Base.metadata.tables.items() if name not in existing]
+        models.Base.metadata.create_all(bind=connection, tables=missing)
+    return [table.name for table in missing]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m app.startup")
+    parser.add_argument("command", choices=["init-db", "check", "create-missing-tables"])
+    args = parser.parse_args()
+    if args.command == "init-db":
+        init_db()
+        print("Database created at the Alembic head")
+    elif args.command == "create-missing-tables":
+        created = create_missing_tables()
+        print(f"Created {', '.join(created)}" if created else "No tables were missing")
+    else:
+        from app.database import engine
+
+        with engine.connect() as connection:
+            try:
+                check_schema(connection)
+            except SchemaMismatchError as exc:
+                print(exc, file=sys.stderr)
+                sys.exit(1)
+        print("Database schema is current")
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+from collections import Counter
+
+from sqlalchemy import event, func, inspect, select, true, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import AsyncSessionLocal, upsert_insert
+
+logger = logging.getLogger(__name__)
+
+STATS_ROW_ID = 1
+_PENDING_DELTAS_KEY = "pending_stats_deltas"
+
+# Deltas committed by this worker and not yet folded into the counters row.
+_pending: Counter = Counter()
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _count_query():
+    def count(model, *criteria):
+        return select(func.count()).select_from(model).where(*criteria).scalar_subquery()
+
+    return select(
+        count(models.User).label("users"),
+        count(models.User, models.User.is_admin == true()).label("admins"),
+        count(models.Booking).label("bookings"),
+        count(models.DeletedUser).label("deleted_users"),
+        count(models.DeletedBooking).label("deleted_bookings"),
+        count(models.BookingUpdateRequest, models.BookingUpdateRequest.status == "pending").label(
+            "pending_update_requests"
+        ),
+    )
+
+
+def rebuild_stats(db: Session) -> models.AdminStats:
+    """Recompute the counters from the base tables (backfill or drift repair)."""
+    counts = db.execute(_count_query()).one()._asdict()
+    table = models.AdminStats.__table__
+    make_insert = upsert_insert(db.get_bind().dialect.name)
+    if make_insert is not None:
+        db.execute(
+            make_insert(table)
+            .values(id=STATS_ROW_ID, **counts)
+            .on_conflict_do_update(index_elements=["id"], set_=counts)
+        )
+    else:
+        db.execute(table.delete())
+        db.execute(table.insert().values(id=STATS_ROW_ID, **counts))
+    return db.get(models.AdminStats, STATS_ROW_ID, populate_existing=True)
+
+
+def _changed(obj, attribute: str):
+    """Return (old, new) for an attribute modified in this flush, or None."""
+    history = inspect(obj).attrs[attribute].history
+    if not history.has_changes():
+        return None
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+
+def _is_pending(status) -> bool:
+    return status in (None, "pending")
+
+
+def _flush_deltas(session: Session) -> Counter:
+    deltas = Counter()
+    for sign, objects in ((1, session.new), (-1, session.deleted)):
+        for obj in objects:
+            if isinstance(obj, models.User):
+                deltas["users"] += sign
+                deltas["admins"] += sign * bool(obj.is_admin)
+            elif isinstance(obj, models.Booking):
+                deltas["bookings"] += sign
+            elif isinstance(obj, models.DeletedUser):
+                deltas["deleted_users"] += sign
+            elif isinstance(obj, models.DeletedBooking):
+                deltas["deleted_bookings"] += sign
+            elif isinstance(obj, models.BookingUpdateRequest):
+                deltas["pending_update_requests"] += sign * _is_pending(obj.status)
+
+    for obj in session.dirty:
+        if isinstance(obj, models.User):
+            change = _changed(obj, "is_admin")
+            if change:
+                deltas["admins"] += bool(change[1]) - bool(change[0])
+        elif isinstance(obj, models.BookingUpdateRequest):
+            change = _changed(obj, "status")
+            if change:
+                deltas["pending_update_requests"] += _is_pending(change[1]) - _is_pending(change[0])
+    return deltas
+
+
+def _fold(connection, deltas: dict):
+    table = models.AdminStats.__table__
+    # No row means the reader rebuilds it from the base tables, which
+    # already include these changes.
+    connection.execute(
+        update(table)
+        .where(table.c.id == STATS_ROW_ID)
+        .values({name: table.c[name] + delta for name, delta in deltas.items()})
+    )
+
+
+def _take_pending() -> dict:
+    deltas = {name: delta for name, delta in _pending.items() if delta}
+    _pending.clear()
+    return deltas
+
+
+async def fold_pending():
+    """Apply this worker's committed deltas to the counters row, in a transaction of their own."""
+    # Let folds already started by this worker land first.
+    running = [task for task in _background_tasks if task.get_loop() is asyncio.get_running_loop()]
+    if running:
+        await asyncio.gather(*running, return_exceptions=True)
+    deltas = _take_pending()
+    if not deltas:
+        return
+    try:
+        async with AsyncSessionLocal() as db:
+            await db.run_sync(lambda session: _fold(session.connection(), deltas))
+            await db.commit()
+    except BaseException:
+        _pending.update(deltas)
+        raise
+
+
+async def _fold_in_background():
+    try:
+        await fold_pending()
+    except Exception:
+        logger.exception("Could not update admin stats; will retry on the next write")
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_stats_deltas(session, flush_context):
+    """Note this flush's inserts, deletes and status changes for the counters row."""
+    deltas = _flush_deltas(session)
+    if any(deltas.values()):
+        session.info.setdefault(_PENDING_DELTAS_KEY, Counter()).update(deltas)
+
+
+@event.listens_for(Session, "after_commit")
+def _fold_committed(session):
+    """
+    Fold the deltas in after the commit, so booking writes never wait on the
+    single counters row. ``GET /admin/stats`` folds first, so this worker
+    reads its own writes; other workers' arrive a moment later. Deltas lost
+    to a crash in between are repaired with ``python -m app.stats_counters``.
+    """
+    if session.in_nested_transaction():
+        return  # a released SAVEPOINT; wait for the outer commit
+    deltas = session.info.pop(_PENDING_DELTAS_KEY, None)
+    if not deltas:
+        return
+    _pending.update(deltas)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # Maintenance scripts use plain sessions and no event loop.
+        with session.get_bind().begin() as connection:
+            _fold(connection, _take_pending())
+        return
+    task = loop.create_task(_fold_in_background())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_uncommitted(session, transaction):
+    if transaction.parent is None:
+        session.info.pop(_PENDING_DELTAS_KEY, None)
+
+
+if __name__ == "__main__":
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        stats = rebuild_stats(db)
+        db.commit()
+        print(f"Admin stats rebuilt: {stats.users} users, {stats.bookings} bookings")
+    finally:
+        db.close()
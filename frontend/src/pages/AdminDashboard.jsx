@@ -1,5 +1,8 @@
 import { useEffect, useState } from 'react'
-import { apiRequest } from '../services/apiClient'
+import { apiRequest, subscribeToEvents } from '../services/apiClient'
+
+// Bursts of booking changes are folded into one refresh.
+const LIVE_REFRESH_DELAY_MS = 1000
 
 const AdminDashboard = () => {
   const [stats, setStats] = useState(null)
@@ -8,14 +11,14 @@ const AdminDashboard = () => {
   const [error, setError] = useState('')
   const [loading, setLoading] = useState(true)
 
-  const loadData = async () => {
-    setLoading(true)
+  const loadData = async ({ quiet = false } = {}) => {
+    if (!quiet) setLoading(true)
     setError('')
     try {
       const [statsResponse, usersResponse, bookingsResponse] = await Promise.all([
         apiRequest('/admin/stats'),
-        apiRequest('/admin/users'),
-        apiRequest('/admin/bookings'),
+        apiRequest('/admin/users?limit=10'),
+        apiRequest('/admin/bookings?limit=8'),
       ])
       setStats(statsResponse)
       setUsers(usersResponse)
@@ -31,6 +34,26 @@ const AdminDashboard = () => {
     loadData()
   }, [])
 
+  useEffect(() => {
+    let refreshTimer = null
+    const scheduleRefresh = () => {
+      if (refreshTimer) return
+      refreshTimer = setTimeout(() => {
+        refreshTimer = null
+        loadData({ quiet: true })
+      }, LIVE_REFRESH_DELAY_MS)
+    }
+    const unsubscribe = subscribeToEvents(
+      '/admin/events',
+      { booking: scheduleRefresh, update_request: scheduleRefresh, resync: scheduleRefresh },
+      { tokenPath: '/admin/events/token' },
+    )
+    return () => {
+      clearTimeout(refreshTimer)
+      unsubscribe()
+    }
+  }, [])
+
   return (
     <main className="admin-page">
       <section className="section">
@@ -1,6 +1,6 @@
 import { useCallback, useEffect, useMemo, useRef, useState } from 'react'
 import useAuth from '../hooks/useAuth'
-import { apiRequest } from '../services/apiClient'
+import { apiRequest, subscribeToEvents } from '../services/apiClient'
 
 const TIME_SLOTS = [
   { value: '09:00', label: '09:00 – 10:00' },
@@ -11,6 +11,10 @@ const TIME_SLOTS = [
   { value: '18:00', label: '18:00 – 19:30' },
 ]
 
+// Matches the API's Cache-Control max-age on availability, so seats booked
+// by other visitors show up within seconds.
+const AVAILABILITY_CACHE_TTL_MS = 5000
+
 const getTodayDate = () => new Date().toISOString().slice(0, 10)
 const getDefaultDateTime = () => `${getTodayDate()}T${TIME_SLOTS[0].value}`
 
@@ -74,6 +78,7 @@ const Bookings = () => {
   const bookingFormRef = useRef(null)
   const toastTimeoutRef = useRef(null)
   const availabilityRequestIdRef = useRef(0)
+  const availabilityCacheRef = useRef(new Map())
 
   const showToast = useCallback((type, message) => {
     if (toastTimeoutRef.current) {
@@ -155,13 +160,21 @@ const Bookings = () => {
     const fetchAvailability = async () => {
       try {
         setAvailabilityError('')
-        setAvailabilityStatus('loading')
-        const data = await apiRequest(
-          `/bookings/availability?date_time=${encodeURIComponent(slotForApi)}&experience_type=${formState.experience_type}`,
-          { method: 'GET' },
-        )
+        const day = slotForApi.slice(0, 10)
+        const cacheKey = `${day}|${formState.experience_type}`
+        const cached = availabilityCacheRef.current.get(cacheKey)
+        let daySlots = cached && Date.now() - cached.fetchedAt < AVAILABILITY_CACHE_TTL_MS ? cached.slots : null
+        if (!daySlots) {
+          setAvailabilityStatus('loading')
+          const data = await apiRequest(
+            `/bookings/availability/calendar?from=${day}&to=${day}&experience_type=${formState.experience_type}`,
+            { method: 'GET' },
+          )
+          daySlots = data.slots
+          availabilityCacheRef.current.set(cacheKey, { slots: daySlots, fetchedAt: Date.now() })
+        }
         if (availabilityRequestIdRef.current === requestId) {
-          setAvailabilityStatus(data)
+          setAvailabilityStatus(daySlots.find((slot) => slot.date_time === slotForApi) || null)
         }
       } catch (err) {
         if (availabilityRequestIdRef.current === requestId) {
@@ -173,6 +186,32 @@ const Bookings = () => {
     fetchAvailability()
   }, [formState.date_time, formState.experience_type, dateTimeError])
 
+  const availabilityDay = formState.date_time ? formState.date_time.slice(0, 10) : ''
+
+  useEffect(() => {
+    if (!availabilityDay) return undefined
+    const experienceType = formState.experience_type
+    const cacheKey = `${availabilityDay}|${experienceType}`
+    const applySlot = (slot) => {
+      if (slot.experience_type !== experienceType) return
+      const cached = availabilityCacheRef.current.get(cacheKey)
+      if (cached) {
+        const slots = cached.slots.map((item) => (item.date_time === slot.date_time ? slot : item))
+        availabilityCacheRef.current.set(cacheKey, { ...cached, slots })
+      }
+      setAvailabilityStatus((current) =>
+        current && typeof current === 'object' && current.date_time === slot.date_time ? slot : current,
+      )
+    }
+    return subscribeToEvents(
+      `/bookings/availability/stream?from=${availabilityDay}&to=${availabilityDay}&experience_type=${experienceType}`,
+      {
+        slot: applySlot,
+        resync: () => availabilityCacheRef.current.delete(cacheKey),
+      },
+    )
+  }, [availabilityDay, formState.experience_type])
+
   useEffect(() => {
     setFormState(createInitialForm())
   }, [])
@@ -247,9 +286,11 @@ const Bookings = () => {
       const created = await apiRequest('/bookings/', {
         method: 'POST',
         body: payload,
+        idempotent: true,
       })
       setBookings((prev) => [...prev, created].sort((a, b) => new Date(a.date_time) - new Date(b.date_time)))
       showToast('success', 'Reservation created successfully')
+      availabilityCacheRef.current.clear()
       setGuestContacts([{ name: '', email: '' }])
       setFormState((prev) => ({ ...createInitialForm(), experience_type: prev.experience_type }))
       setAvailabilityStatus(null)
@@ -266,6 +307,7 @@ const Bookings = () => {
     try {
       await apiRequest(`/bookings/${bookingId}`, { method: 'DELETE' })
       setBookings((prev) => prev.filter((booking) => booking.id !== bookingId))
+      availabilityCacheRef.current.clear()
       showToast('info', 'Reservation cancelled')
     } catch (err) {
       setError(err.message || 'Unable to cancel reservation')
@@ -357,6 +399,7 @@ const Bookings = () => {
       const created = await apiRequest(`/bookings/${activeBookingId}/update-request`, {
         method: 'POST',
         body: payload,
+        idempotent: true,
       })
       setUpdateRequests((prev) => [created, ...prev])
       setRequestGlobalSuccess('Update request sent. We will notify you once it is reviewed.')
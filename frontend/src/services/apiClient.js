@@ -29,6 +29,16 @@ export const clearAuthTokens = () => {
   setStoredToken(REFRESH_TOKEN_KEY, null)
 }
 
+const IDEMPOTENCY_HEADER = 'Idempotency-Key'
+const NETWORK_RETRY_DELAY_MS = 500
+
+const createIdempotencyKey = () =>
+  typeof crypto !== 'undefined' && crypto.randomUUID
+    ? crypto.randomUUID()
+    : `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+
+const wait = (ms) => new Promise((resolve) => setTimeout(resolve, ms))
+
 const buildUrl = (path) => `${API_BASE_URL}${path.startsWith('/') ? path : `/${path}`}`
 
 const parseError = async (response) => {
@@ -80,8 +90,13 @@ const refreshAccessToken = async () => {
 
 export const apiRequest = async (
   path,
-  { method = 'GET', headers = {}, body, auth = true, retry = true } = {},
+  { method = 'GET', headers = {}, body, auth = true, retry = true, idempotent = false } = {},
 ) => {
+  // One key per logical request: every retry below resends it, so the API
+  // replays the first outcome instead of creating a second booking.
+  if (idempotent && !headers[IDEMPOTENCY_HEADER]) {
+    headers = { ...headers, [IDEMPOTENCY_HEADER]: createIdempotencyKey() }
+  }
   const finalHeaders = { ...headers }
   let payload = body
 
@@ -100,11 +115,20 @@ export const apiRequest = async (
     }
   }
 
-  const response = await fetch(buildUrl(path), {
-    method,
-    headers: finalHeaders,
-    body: payload,
-  })
+  let response
+  try {
+    response = await fetch(buildUrl(path), {
+      method,
+      headers: finalHeaders,
+      body: payload,
+    })
+  } catch (error) {
+    if (!idempotent || !retry) {
+      throw error
+    }
+    await wait(NETWORK_RETRY_DELAY_MS)
+    return apiRequest(path, { method, headers, body, auth, retry: false, idempotent })
+  }
 
   if (response.status === 401 && auth && retry) {
     try {
@@ -112,7 +136,7 @@ export const apiRequest = async (
       if (!newAccessToken) {
         throw new Error('Unable to refresh access token')
       }
-      return apiRequest(path, { method, headers, body, auth, retry: false })
+      return apiRequest(path, { method, headers, body, auth, retry: false, idempotent })
     } catch (error) {
       clearAuthTokens()
       throw error
@@ -130,3 +154,43 @@ export const apiRequest = async (
 
   return response.json()
 }
+
+const STREAM_RECONNECT_DELAY_MS = 5000
+
+// Opens a Server-Sent Events stream and calls handlers[eventName] with each
+// parsed payload. EventSource cannot send an Authorization header, so for
+// authenticated streams a short-lived token is fetched from tokenPath and
+// passed as ?token=. Returns a function that closes the stream.
+export const subscribeToEvents = (path, handlers, { tokenPath } = {}) => {
+  let source = null
+  let closed = false
+  let reconnectTimer = null
+
+  const connect = async () => {
+    let url = buildUrl(path)
+    if (tokenPath) {
+      const { token } = await apiRequest(tokenPath, { method: 'POST' })
+      url += `${url.includes('?') ? '&' : '?'}token=${encodeURIComponent(token)}`
+    }
+    if (closed) return
+    source = new EventSource(url)
+    Object.entries(handlers).forEach(([name, handler]) => {
+      source.addEventListener(name, (event) => handler(JSON.parse(event.data)))
+    })
+    source.onerror = () => {
+      // The browser reconnects by itself unless the server refused the
+      // stream, e.g. because the token expired; then fetch a fresh one.
+      if (source.readyState === EventSource.CLOSED && !closed) {
+        reconnectTimer = setTimeout(() => connect().catch(() => {}), STREAM_RECONNECT_DELAY_MS)
+      }
+    }
+  }
+
+  connect().catch(() => {})
+
+  return () => {
+    closed = true
+    clearTimeout(reconnectTimer)
+    if (source) source.close()
+  }
+}
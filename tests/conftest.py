@@ -0,0 +1,61 @@
+import os
+import tempfile
+
+# Point the app at a throwaway database before anything imports app.config.
+_db_dir = tempfile.mkdtemp(prefix="pcn-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ.setdefault("PASSWORD_HASH_WORKERS", "0")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Tables come from create_all, not Alembic.
+os.environ.setdefault("SCHEMA_CHECK", "off")
+
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.fixture(scope="module")
+def database():
+    """A fresh schema for one test module, with the per-worker caches emptied."""
+    from app import models
+    from app.auth import token_versions
+    from app.availability_cache import availability_cache
+    from app.database import engine
+
+    models.Base.metadata.create_all(bind=engine)
+    token_versions._versions.clear()
+    availability_cache.clear()
+    yield engine
+    models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture(scope="module")
+def client(database):
+    """One event loop for the module, so tasks started after a commit get to run."""
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
+
+
+def register(client, email, password="secret-pw", is_admin=False) -> dict:
+    """Create a user through the API and log in; returns the token response."""
+    from sqlalchemy import update
+
+    from app import models
+    from app.database import SessionLocal
+
+    created = client.post(
+        "/users/", json={"name": "Test", "surname": "User", "email": email, "phone": "1", "password": password}
+    )
+    assert created.status_code == 200, created.text
+    if is_admin:
+        with SessionLocal() as db:
+            db.execute(update(models.User).where(models.User.email == email).values(is_admin=True))
+            db.commit()
+    tokens = client.post("/token", data={"username": email, "password": password})
+    assert tokens.status_code == 200, tokens.text
+    return tokens.json()
+
+
+def bearer(tokens: dict) -> dict:
+    return {"Authorization": f"Bearer {tokens['access_token']}"}
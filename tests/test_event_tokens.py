@@ -0,0 +1,51 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.auth.jwt_handler import create_events_token, create_user_access_token
+from app.database import SessionLocal, engine
+from app.main import app
+
+
+@pytest.fixture(scope="module")
+def users():
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        admin = models.User(name="Ada", surname="Lovelace", email="admin@example.com", phone="1", password="x", is_admin=True)
+        visitor = models.User(name="Alan", surname="Turing", email="visitor@example.com", phone="2", password="x")
+        db.add_all([admin, visitor])
+        db.commit()
+        yield admin, visitor
+    finally:
+        db.close()
+        models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_only_admins_get_events_tokens(client, users):
+    admin, visitor = users
+    issued = client.post("/admin/events/token", headers=_bearer(create_user_access_token(admin)))
+    assert issued.status_code == 200
+    assert issued.json()["token"]
+    assert client.post("/admin/events/token", headers=_bearer(create_user_access_token(visitor))).status_code == 403
+
+
+def test_events_token_is_not_an_access_token(client, users):
+    admin, _ = users
+    assert client.get("/admin/stats", headers=_bearer(create_events_token(admin))).status_code == 401
+
+
+def test_event_stream_rejects_other_tokens(client, users):
+    admin, visitor = users
+    assert client.get("/admin/events", params={"token": create_user_access_token(admin)}).status_code == 401
+    assert client.get("/admin/events", params={"token": create_events_token(visitor)}).status_code == 403
+    assert client.get("/admin/events", headers=_bearer(create_user_access_token(admin))).status_code == 422
@@ -0,0 +1,63 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import models
+from app.auth.dependencies import TokenIdentity, get_current_identity
+from app.config import settings
+from app.database import SessionLocal, engine
+from app.main import app
+
+ADMIN_LISTS = (
+    "/admin/users",
+    "/admin/bookings",
+    "/admin/deleted-bookings",
+    "/admin/booking-update-requests",
+)
+
+
+@pytest.fixture(scope="module")
+def client():
+    models.Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        user = models.User(name="Ada", surname="Lovelace", email="ada@example.com", phone="1", password="x")
+        db.add(user)
+        db.flush()
+        slot = datetime.datetime(2030, 6, 1, 10, 30)
+        booking = models.Booking(user_id=user.id, date_time=slot, people=2, experience_type="guided_tour")
+        booking.guest_contacts = [{"name": "Grace", "email": "grace@example.com"}]
+        db.add_all([
+            booking,
+            models.Booking(user_id=user.id, date_time=slot, people=1, experience_type="tour_tasting"),
+            models.DeletedBooking(
+                booking_id=99, date_time=slot, people=3, experience_type="guided_tour", user_id=user.id,
+                user_name="Ada", user_surname="Lovelace", user_email="ada@example.com", user_phone="1",
+            ),
+        ])
+        db.flush()
+        db.add(models.BookingUpdateRequest(booking_id=booking.id, user_id=user.id, requested_people=4))
+        db.commit()
+    finally:
+        db.close()
+
+    app.dependency_overrides[get_current_identity] = lambda: TokenIdentity(
+        id=1, email="ada@example.com", is_admin=True, token_version=0
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+    models.Base.metadata.drop_all(bind=engine)
+
+
+@pytest.mark.parametrize("path", ADMIN_LISTS)
+def test_fast_rows_match_validated_response(client, monkeypatch, path):
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", False)
+    validated = client.get(path)
+    monkeypatch.setattr(settings, "FAST_SERIALIZATION", True)
+    fast = client.get(path)
+
+    assert validated.status_code == fast.status_code == 200
+    assert validated.json(), "fixture data should make every list non-empty"
+    assert fast.json() == validated.json()
+    assert fast.headers.get("x-next-cursor") == validated.headers.get("x-next-cursor")
@@ -0,0 +1,45 @@
+import datetime
+
+import pytest
+from sqlalchemy import select, text
+
+from app import models
+from app.database import engine
+from app.routes.admin_routes import bookings_query, update_requests_query
+
+
+@pytest.fixture(scope="module")
+def connection():
+    models.Base.metadata.create_all(bind=engine)
+    with engine.connect() as connection:
+        yield connection
+    models.Base.metadata.drop_all(bind=engine)
+
+
+def query_plan(connection, query) -> str:
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}")).all()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_slot_lookup_uses_date_time_experience_index(connection):
+    start = datetime.datetime(2026, 6, 1, 9, 0)
+    query = bookings_query(
+        date_from=start, date_to=start + datetime.timedelta(days=1), experience_type="guided_tour"
+    )
+    assert "ix_bookings_date_time_experience_type" in query_plan(connection, query)
+
+
+def test_own_bookings_use_user_index(connection):
+    query = select(models.Booking).where(models.Booking.user_id == 1)
+    assert "ix_bookings_user_id_date_time" in query_plan(connection, query)
+
+
+def test_pending_queue_uses_request_indexes(connection):
+    order_by = (models.BookingUpdateRequest.created_at, models.BookingUpdateRequest.id)
+    query = update_requests_query(status="pending").order_by(*(column.desc() for column in order_by)).limit(51)
+    plan = query_plan(connection, query)
+    assert "ix_booking_update_requests_pending_created_at" in plan or (
+        "ix_booking_update_requests_status_created_at" in plan
+    )
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan
@@ -0,0 +1,44 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from app import models
+from app.database import SessionLocal
+
+from conftest import bearer, register
+
+
+def _book(client, tokens, day):
+    return client.post(
+        "/bookings/",
+        json={"date_time": f"2030-06-{day:02d}T10:30:00", "people": 1, "experience_type": "guided_tour"},
+        headers=bearer(tokens),
+    )
+
+
+def test_concurrent_first_writes_without_a_counters_row(client):
+    admin = register(client, "stats-admin@example.com", is_admin=True)
+    visitor = register(client, "stats-visitor@example.com")
+    with SessionLocal() as db:
+        db.query(models.AdminStats).delete()
+        db.commit()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(lambda day: _book(client, visitor, day), range(3, 11)))
+    assert [response.status_code for response in responses] == [200] * 8
+
+    stats = client.get("/admin/stats", headers=bearer(admin)).json()
+    assert stats["total_users"] == 2
+    assert stats["active_bookings"] == 8
+
+
+def test_counters_follow_later_writes(client):
+    admin = register(client, "stats-admin-2@example.com", is_admin=True)
+    visitor = register(client, "stats-visitor-2@example.com")
+    before = client.get("/admin/stats", headers=bearer(admin)).json()
+
+    booking = _book(client, visitor, 12).json()
+    assert client.get("/admin/stats", headers=bearer(admin)).json()["active_bookings"] == before["active_bookings"] + 1
+
+    assert client.delete(f"/bookings/{booking['id']}", headers=bearer(visitor)).status_code == 200
+    after = client.get("/admin/stats", headers=bearer(admin)).json()
+    assert after["active_bookings"] == before["active_bookings"]
+    assert after["deleted_bookings"] == before["deleted_bookings"] + 1
@@ -0,0 +1,37 @@
+from sqlalchemy import update
+
+from app import models
+from app.database import SessionLocal
+
+from conftest import bearer, register
+
+
+def test_password_change_revokes_refresh_tokens(client):
+    tokens = register(client, "changer@example.com", password="old-password")
+
+    changed = client.post(
+        "/users/me/password",
+        json={"current_password": "old-password", "new_password": "new-password"},
+        headers=bearer(tokens),
+    )
+    assert changed.status_code == 200
+
+    assert client.get("/users/me", headers=bearer(tokens)).status_code == 401
+    assert client.post("/token/refresh", json={"refresh_token": tokens["refresh_token"]}).status_code == 401
+
+
+def test_writes_check_revocation_past_the_version_cache(client):
+    tokens = register(client, "elsewhere@example.com")
+    assert client.get("/users/me/bookings", headers=bearer(tokens)).status_code == 200  # caches the version
+
+    # A revocation committed by another worker leaves this worker's cache stale.
+    with SessionLocal() as db:
+        db.execute(
+            update(models.User)
+            .where(models.User.email == "elsewhere@example.com")
+            .values(token_version=models.User.token_version + 1)
+        )
+        db.commit()
+
+    assert client.get("/users/me/bookings", headers=bearer(tokens)).status_code == 200
+    assert client.put("/users/me", json={"phone": "2"}, headers=bearer(tokens)).status_code == 401